@@ -0,0 +1,56 @@
+"""Start-up time benchmark.
+
+Each measurement runs in a fresh interpreter so module caches do not hide
+import costs. Reports the median over several runs of:
+  - import main:       what the GUI imports before the window is created
+  - import all tabs:   the cost lazy tab construction avoids at launch
+  - import cli:        the headless entry point
+  - window (--gui):    main.RockboxManagerApp() until its first update()
+
+    python bench_startup.py [--runs N] [--gui]"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SNIPPETS = {
+    "import main": "import main",
+    "import all tabs": "import main, tab_statistics, tab_playlists, tab_discovery, tab_optimizer, tab_settings",
+    "import cli": "import cli",
+}
+
+GUI_SNIPPET = "import main; app = main.RockboxManagerApp(); app.update(); app.destroy()"
+
+def time_snippet(code, runs):
+    """Median wall time (seconds) of `code` in a fresh interpreter."""
+    timer = ("import time; _t = time.perf_counter()\n"
+             f"{code}\n"
+             "print(time.perf_counter() - _t)")
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", timer], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        if out.returncode != 0:
+            return None, out.stderr.strip().splitlines()[-1] if out.stderr else "failed"
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(times), None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--gui", action="store_true", help="also time window creation (needs a display)")
+    args = parser.parse_args()
+
+    snippets = dict(SNIPPETS)
+    if args.gui: snippets["window"] = GUI_SNIPPET
+
+    for name, code in snippets.items():
+        median, error = time_snippet(code, args.runs)
+        if error:
+            print(f"{name:<18} error: {error}")
+        else:
+            print(f"{name:<18} {median * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
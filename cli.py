@@ -0,0 +1,218 @@
+"""Headless entry point, e.g. for cron jobs against a mounted iPod.
+
+    python cli.py parse E:\\
+    python cli.py stats /media/ipod --filter "This Month"
+    python cli.py stats /media/ipod --from 2023-01-01 --to 2023-06-30 --heatmap
+    python cli.py generate-playlists /media/ipod --playlists on_repeat,flashback --limit flashback=30
+    python cli.py export-metrics /media/ipod --format csv
+    python cli.py scrobble /media/ipod --config config.json
+
+Only the modules a command needs are imported; no Tk/matplotlib at all."""
+import argparse
+import os
+import sys
+
+def load_data(args):
+    """Creates RockboxData for the drive and parses its log. Returns None on failure."""
+    from data_manager import RockboxData
+
+    data = RockboxData()
+    data.stream_mode = args.stream
+    data.parse_workers = args.workers
+    data.max_memory_mb = args.max_memory
+    data.set_paths(args.drive)
+    if not os.path.exists(data.log_path):
+        print(f"Log not found in {args.drive}", file=sys.stderr)
+        return None
+    for drive in args.add_device:
+        if not data.add_device(drive): print(f"Log not found in {drive}", file=sys.stderr)
+    for log_path in args.add_log:
+        if not data.add_log(log_path): print(f"Log not found: {log_path}", file=sys.stderr)
+    if not data.parse_log():
+        print("Could not parse the log", file=sys.stderr)
+        return None
+    return data
+
+def cmd_parse(args):
+    data = load_data(args)
+    if data is None: return 1
+    if data.stream_mode:
+        tracks = data.aggregates.tracks if data.has_plays() else None
+        plays = 0 if tracks is None else int(tracks['plays'].sum())
+        count = 0 if tracks is None else len(tracks)
+        print(f"{plays:,} plays of {count:,} tracks (streamed)")
+    else:
+        df = data.df
+        tracks = df['original_path'].nunique() if not df.empty else 0
+        print(f"{len(df):,} plays of {tracks:,} tracks")
+    return 0
+
+def cmd_stats(args):
+    from data_manager import time_window
+    from listening_stats import compute_stats, WEEKDAYS
+
+    if args.date_from or args.date_to:
+        import pandas as pd
+        try:
+            start = pd.Timestamp(args.date_from).normalize() if args.date_from else None
+            end = pd.Timestamp(args.date_to).normalize() + pd.Timedelta(days=1) if args.date_to else None
+        except ValueError:
+            print("Dates must be YYYY-MM-DD", file=sys.stderr)
+            return 2
+        label = f"{args.date_from or 'start'} to {args.date_to or 'today'}"
+    else:
+        start, end = time_window(args.filter)
+        label = args.filter
+
+    data = load_data(args)
+    if data is None: return 1
+    stats = compute_stats(data, start, end) if data.has_plays() else None
+    if stats is None:
+        print(f"No plays ({label})")
+        return 0
+
+    print(f"{label}: {stats['minutes']:,} minutes, {stats['plays']:,} plays, {stats['avg']} per day")
+    for col, title in (('artist', "Top Artists"), ('album', "Top Albums"), ('title', "Top Tracks")):
+        if col not in stats['tops']: continue
+        print(f"\n{title}")
+        for i, (name, count) in enumerate(stats['tops'][col][0].items(), start=1):
+            print(f"  {i}. {name} ({count})")
+
+    hours, days = stats['hour_counts'], stats['weekday_counts']
+    if hours.sum() > 0:
+        print(f"\nPeak hour: {int(hours.argmax()):02d}:00 ({hours.max()} plays)")
+        print(f"Favorite day: {WEEKDAYS[int(days.argmax())]} ({days.max()} plays)")
+
+    if args.heatmap:
+        print("\nPlays by weekday and hour")
+        print("     " + "".join(f"{h:>6}" for h in range(24)))
+        for name, row in zip(WEEKDAYS, stats['heatmap']):
+            print(f"{name[:3]:<5}" + "".join(f"{count:>6}" for count in row))
+    return 0
+
+def cmd_generate_playlists(args):
+    from playlist_generator import PlaylistGenerator
+
+    data = load_data(args)
+    if data is None: return 1
+    if not data.has_plays():
+        print("Log is empty")
+        return 0
+
+    generator = PlaylistGenerator(data, args.rules)
+    rules = generator.rules()
+    names = [n.strip() for n in args.playlists.split(",") if n.strip()]
+    if args.custom:
+        names += [rule_id for rule_id in generator.custom_rule_limits() if rule_id not in names]
+    unknown = [n for n in names if n not in rules]
+    if unknown:
+        print(f"Unknown playlists: {', '.join(unknown)} (choose from {', '.join(rules)})", file=sys.stderr)
+        return 2
+    limits = {name: rules[name].limit for name in names}
+    for item in args.limit:
+        name, _, value = item.partition("=")
+        if name not in limits or not value.isdigit():
+            print(f"Invalid --limit {item}", file=sys.stderr)
+            return 2
+        limits[name] = max(1, int(value))
+
+    for filename in generator.generate(limits):
+        print(f"Wrote {filename}")
+    for filename in generator.unchanged:
+        print(f"Unchanged {filename}")
+    for filename in generator.removed:
+        print(f"Removed {filename}")
+    if args.metrics:
+        path = generator.export_metrics()
+        if path: print(f"Wrote {path}")
+    return 0
+
+def cmd_export_metrics(args):
+    from playlist_generator import PlaylistGenerator
+
+    data = load_data(args)
+    if data is None: return 1
+    if not data.has_plays():
+        print("Log is empty")
+        return 0
+    path = PlaylistGenerator(data).export_metrics(args.format)
+    if not path:
+        print(f"Could not write user_metrics.{args.format}", file=sys.stderr)
+        return 1
+    print(f"Wrote {path}")
+    return 0
+
+def cmd_scrobble(args):
+    from scrobbler import Scrobbler
+
+    data = load_data(args)
+    if data is None: return 1
+    lastfm = Scrobbler(data, args.config)
+    if not lastfm.load_config() or not lastfm.session_key:
+        print(f"No Last.fm session in {args.config}; connect once from the Discovery tab", file=sys.stderr)
+        return 1
+
+    pending = lastfm.pending_plays() if data.has_plays() else []
+    if len(pending) == 0:
+        print("No new songs to submit.")
+        return 0
+    sent = lastfm.scrobble(pending, progress=print)
+    print(f"{sent} tracks were successfully sent to Last.fm.")
+    return 0 if sent == len(pending) else 1
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Rockbox Data Wizard (headless)")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("drive", help="root of the mounted iPod")
+    common.add_argument("--stream", action="store_true", help="bounded-memory streaming parse")
+    common.add_argument("--max-memory", type=int, default=256, metavar="MB", help="memory cap in streaming mode")
+    common.add_argument("--workers", type=int, default=1, help="processes for parsing large logs")
+    common.add_argument("--add-device", action="append", default=[], metavar="DRIVE",
+                        help="merge another iPod's log into the history (remembered)")
+    common.add_argument("--add-log", action="append", default=[], metavar="FILE",
+                        help="merge an archived playback.log (remembered)")
+
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("parse", parents=[common], help="parse the log and update the local caches")
+
+    stats = sub.add_parser("stats", parents=[common], help="print listening statistics")
+    stats.add_argument("--filter", default="All Time",
+                       choices=["All Time", "This Year", "This Month", "This Week"])
+    stats.add_argument("--from", dest="date_from", metavar="YYYY-MM-DD", help="custom range start (overrides --filter)")
+    stats.add_argument("--to", dest="date_to", metavar="YYYY-MM-DD", help="custom range end, inclusive")
+    stats.add_argument("--heatmap", action="store_true", help="also print plays per weekday and hour")
+
+    playlists = sub.add_parser("generate-playlists", parents=[common], help="write the (Dynamic) playlists")
+    playlists.add_argument("--playlists", default="on_repeat,time_travel,flashback",
+                           help="comma separated rule ids: on_repeat, forgotten, second_chance, time_travel, "
+                                "flashback or a custom rule")
+    playlists.add_argument("--limit", action="append", default=[], metavar="NAME=N",
+                           help="track limit for one playlist (repeatable)")
+    playlists.add_argument("--custom", action="store_true",
+                           help="also generate every custom rule (.rockbox/playlist_rules.json and --rules)")
+    playlists.add_argument("--rules", action="append", default=[], metavar="FILE",
+                           help="JSON file with more playlist rules (repeatable)")
+    playlists.add_argument("--metrics", action="store_true", help="also write user_metrics.json")
+
+    metrics = sub.add_parser("export-metrics", parents=[common], help="write .rockbox/user_metrics.json")
+    metrics.add_argument("--format", default="json", choices=["json", "csv"],
+                         help="csv writes the smaller user_metrics.csv instead")
+
+    scrobble = sub.add_parser("scrobble", parents=[common], help="submit new plays to Last.fm")
+    scrobble.add_argument("--config", default="config.json", help="config file with the Last.fm session")
+    return parser
+
+COMMANDS = {
+    "parse": cmd_parse,
+    "stats": cmd_stats,
+    "generate-playlists": cmd_generate_playlists,
+    "export-metrics": cmd_export_metrics,
+    "scrobble": cmd_scrobble
+}
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return COMMANDS[args.command](args)
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
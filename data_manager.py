@@ -1,209 +1,1007 @@
-import pandas as pd
-import os
-import datetime
-import re
-import glob
-import json
-from mutagen import File 
-from mutagen.easyid3 import EasyID3
-from mutagen.flac import FLAC
-from mutagen.mp4 import MP4
-from io import BytesIO
-from PIL import Image
-
-class RockboxData:
-    def __init__(self):
-        self.drive_path = ""
-        self.log_path = ""
-        self.music_path = ""
-        self.playlist_path = ""
-        self.df = pd.DataFrame()
-        self.existing_playlist_songs = set()
-        self.library_artists = set()
-        self.cache_file = "metadata_cache.json"
-        self.tag_cache = self.load_cache()
-
-    def load_cache(self):
-        """Loads metadata cache from a local JSON file."""
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading cache: {e}")
-        return {}
-
-    def save_cache(self):
-        """Saves current memory cache to a JSON file."""
-        try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.tag_cache, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving cache: {e}")
-
-    def set_paths(self, drive_path):
-        self.drive_path = drive_path
-        self.log_path = os.path.join(drive_path, ".rockbox", "playback.log")
-        self.music_path = os.path.join(drive_path, "Music")
-        self.playlist_path = os.path.join(drive_path, "Playlists")
-
-        if not os.path.exists(self.log_path):
-            alt = os.path.join(drive_path, "playback.log")
-            if os.path.exists(alt):
-                self.log_path = alt
-                return False 
-        return os.path.exists(self.log_path)
-
-    def parse_log(self):
-        """Reads the log and extracts real metadata from files."""
-        if not self.log_path or not os.path.exists(self.log_path): return False
-        
-        data = []
-        cache_updated = False
-
-        try:
-            with open(self.log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-
-            for line in lines:
-                if line.startswith('#') or not line.strip(): continue
-                parts = line.strip().split(':')
-                
-                if len(parts) >= 4:
-                    try:
-                        timestamp = int(parts[0])
-                        play_ms = int(parts[1])
-                        total_ms = int(parts[2])
-                        
-                        is_valid = False
-                        if total_ms > 0:
-                            ratio = play_ms / total_ms
-                            if ratio >= 0.45 or play_ms >= 120000:
-                                is_valid = True
-                        
-                        original_path = ":".join(parts[3:]) 
-                        
-                        artist, album, title, found_new = self.get_metadata(original_path)
-                        if found_new:
-                            cache_updated = True
-                        
-                        data.append({
-                            'timestamp': timestamp,
-                            'dt': datetime.datetime.fromtimestamp(timestamp),
-                            'play_ms': play_ms,
-                            'total_ms': total_ms,
-                            'valid_play': is_valid,
-                            'original_path': original_path,
-                            'artist': artist,
-                            'album': album,
-                            'title': title
-                        })
-                    except ValueError: continue
-            
-            self.df = pd.DataFrame(data)
-            
-            if cache_updated:
-                self.save_cache()
-                
-            return True
-        except Exception as e:
-            print(f"Error parsing log: {e}")
-            return False
-
-    def get_metadata(self, rockbox_path):
-        """Returns: artist, album, title, is_new(bool)"""
-        if rockbox_path in self.tag_cache:
-            val = self.tag_cache[rockbox_path]
-            return val[0], val[1], val[2], False
-
-        rel_path = rockbox_path.replace("/<HDD0>/", "").replace("/", os.sep)
-        full_path = os.path.join(self.drive_path, rel_path)
-
-        artist, album, title = "Unknown", "Unknown Album", "Unknown Title"
-        found_tags = False
-
-        if os.path.exists(full_path):
-            try:
-                audio = File(full_path, easy=True) 
-                if audio:
-                    if 'artist' in audio: artist = audio['artist'][0]
-                    if 'album' in audio: album = audio['album'][0]
-                    if 'title' in audio: title = audio['title'][0]
-                    found_tags = True
-                
-                if not found_tags and full_path.lower().endswith('.m4a'):
-                    m4a = MP4(full_path)
-                    if '\xa9ART' in m4a: artist = m4a['\xa9ART'][0]
-                    if '\xa9alb' in m4a: album = m4a['\xa9alb'][0]
-                    if '\xa9nam' in m4a: title = m4a['\xa9nam'][0]
-                    found_tags = True
-            except Exception:
-                pass 
-
-        if not found_tags or artist == "Unknown":
-            path_parts = rockbox_path.replace("\\", "/").split("/")
-            if len(path_parts) > 3:
-                if "music" in path_parts[2].lower(): 
-                    artist = path_parts[3]
-                    if len(path_parts) > 4:
-                        album = path_parts[4]
-                filename = path_parts[-1]
-                title = re.sub(r'^\d+[\.\s-]*', '', os.path.splitext(filename)[0])
-            else:
-                title = os.path.basename(rockbox_path)
-
-        self.tag_cache[rockbox_path] = [artist, album, title]
-        return artist, album, title, True
-
-    def get_album_art(self, rockbox_path):
-        rel_path = rockbox_path.replace("/<HDD0>/", "").replace("/", os.sep)
-        full_path = os.path.join(self.drive_path, rel_path)
-
-        if not os.path.exists(full_path):
-            return None
-
-        try:
-            file = File(full_path)
-            artwork_data = None
-            if file.tags:
-                if hasattr(file.tags, 'getall'): 
-                    for tag in file.tags.keys():
-                        if tag.startswith('APIC'): 
-                            artwork_data = file.tags[tag].data
-                            break
-                if 'covr' in file.tags:
-                    artwork_data = file.tags['covr'][0]
-            if not artwork_data and hasattr(file, 'pictures') and file.pictures:
-                artwork_data = file.pictures[0].data
-
-            if artwork_data:
-                return Image.open(BytesIO(artwork_data))
-        except Exception:
-            pass
-        return None
-
-    def scan_existing_playlists(self):
-        self.existing_playlist_songs = set()
-        if not os.path.exists(self.playlist_path): return
-
-        for pl_file in glob.glob(os.path.join(self.playlist_path, "*.m3u8")):
-            try:
-                with open(pl_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if not line.startswith('#') and line.strip():
-                            self.existing_playlist_songs.add(line.strip())
-            except: pass
-
-    def scan_library_artists(self):
-        self.library_artists = set()
-        if not os.path.exists(self.music_path): return
-        try:
-            for item in os.listdir(self.music_path):
-                if os.path.isdir(os.path.join(self.music_path, item)):
-                    self.library_artists.add(self.normalize_text(item))
-        except: pass
-
-    def normalize_text(self, text):
-        text = str(text).lower()
-        text = re.sub(r'[^\w\s]', '', text)
-        return text.strip()
\ No newline at end of file
+import pandas as pd
+import numpy as np
+import os
+import re
+import glob
+import json
+import csv
+import sqlite3
+import hashlib
+import threading
+import time
+import unicodedata
+from io import BytesIO
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from play_aggregates import PlayAggregates
+from library_index import LibraryIndex
+from tagcache_reader import load_tagcache, strip_volume
+
+# Bytes hashed at the start of the log to detect truncation/rotation
+LOG_HEAD_BYTES = 4096
+
+# A parsed chunk needs roughly this many times its size in RAM
+STREAM_MEMORY_FACTOR = 8
+
+# Below this many new bytes a parallel parse is not worth the process start-up
+PARALLEL_MIN_BYTES = 32 << 20
+
+# Album art thumbnails: stored size on disk and number kept in memory
+ART_THUMB_SIZE = (200, 200)
+ART_MEMORY_ITEMS = 64
+
+# Threads used to read tags of uncached files (mostly waiting on USB I/O)
+TAG_WORKERS = 8
+
+# Bumped when the snapshot columns change so older snapshots are parsed again
+SNAPSHOT_FORMAT = 2
+
+LOG_COLUMNS = ['timestamp', 'play_ms', 'total_ms']
+TAG_COLUMNS = ['artist', 'album', 'title']
+STRING_COLUMNS = ['original_path'] + TAG_COLUMNS + ['device']
+
+NON_WORD = re.compile(r'[^\w\s]')
+
+def normalize_name(text):
+    """Canonical form for comparing artist names: accents stripped (NFKD),
+    case folded, punctuation removed and whitespace collapsed."""
+    text = unicodedata.normalize('NFKD', str(text))
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    return " ".join(NON_WORD.sub('', text).split())
+
+def local_offsets(timestamps):
+    """Returns the local UTC offset (seconds) for each unix timestamp.
+
+    Offsets are looked up once per UTC day; only days containing a DST
+    transition fall back to a per-play lookup."""
+    def offset(ts):
+        try: return time.localtime(int(ts)).tm_gmtoff
+        except (OverflowError, OSError, ValueError): return 0
+
+    days, inverse = np.unique(timestamps // 86400, return_inverse=True)
+    start = np.array([offset(d * 86400) for d in days], dtype=np.int64)
+    end = np.array([offset(d * 86400 + 86399) for d in days], dtype=np.int64)
+
+    offsets = start[inverse]
+    for i in np.flatnonzero(start != end):
+        rows = np.flatnonzero(inverse == i)
+        offsets[rows] = [offset(ts) for ts in timestamps[rows]]
+    return offsets
+
+def empty_play_frame():
+    return pd.DataFrame(columns=LOG_COLUMNS + ['dt', 'valid_play', 'original_path'] + TAG_COLUMNS + ['device', 'play_key'])
+
+def device_name(drive_path):
+    """Default device label for a drive: its folder name (or the drive letter)."""
+    name = os.path.basename(os.path.normpath(drive_path))
+    return name or drive_path.rstrip("\\/") or "iPod"
+
+def play_keys(df):
+    """64-bit hash of (timestamp, path, play_ms) identifying a play across logs."""
+    return pd.util.hash_pandas_object(df[['timestamp', 'original_path', 'play_ms']], index=False).to_numpy()
+
+def parse_log_bytes(data):
+    """Parses raw playback.log bytes into a columnar frame (without tags).
+
+    Lines look like `timestamp:play_ms:total_ms:path`. The bulk split is
+    done by pandas' C reader; paths that contain ':' end up spread over
+    extra columns and are rejoined afterwards."""
+    buf = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(buf == ord('\n'))
+    starts = np.r_[0, newlines + 1]
+    ends = np.r_[newlines, len(buf)]
+    if starts[-1] == len(buf):
+        starts, ends = starts[:-1], ends[:-1]
+    if len(starts) == 0: return empty_play_frame()
+
+    # Colons per line, computed over the whole buffer at once
+    colons = np.flatnonzero(buf == ord(':'))
+    counts = np.bincount(np.searchsorted(starts, colons, side='right') - 1, minlength=len(starts))
+
+    lengths = ends - starts
+    first = buf[np.minimum(starts, len(buf) - 1)]
+    empty = (lengths == 0) | ((lengths == 1) & (first == ord('\r')))
+    keep = ~empty & (first != ord('#')) & (counts >= 3)
+    if not keep.any(): return empty_play_frame()
+
+    counts = counts[keep]
+    extra = int(counts.max()) - 3
+    raw = pd.read_csv(BytesIO(data), sep=':', header=None, names=range(4 + extra),
+                      skiprows=np.flatnonzero(~keep).tolist(), skip_blank_lines=False,
+                      quoting=csv.QUOTE_NONE, na_filter=False, low_memory=False, encoding_errors='ignore',
+                      dtype={c: object for c in range(3, 4 + extra)})
+
+    path = np.array(raw[3], dtype=object)
+    for k in range(1, extra + 1):
+        joined = counts >= 3 + k
+        path[joined] = path[joined] + ':' + raw[3 + k].to_numpy(dtype=object)[joined]
+
+    nums = raw[[0, 1, 2]]
+    if not all(pd.api.types.is_integer_dtype(t) for t in nums.dtypes):
+        # Garbage in a numeric field: drop those lines like the old int() parser did
+        nums = nums.apply(pd.to_numeric, errors='coerce')
+        valid = (nums.notna() & (nums % 1 == 0)).all(axis=1).to_numpy()
+        nums, path = nums[valid], path[valid]
+    nums = nums.to_numpy(dtype=np.int64)
+
+    timestamp = nums[:, 0]
+    play_ms = nums[:, 1]
+    total_ms = nums[:, 2]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = play_ms / total_ms
+    valid_play = (total_ms > 0) & ((ratio >= 0.45) | (play_ms >= 120000))
+
+    return pd.DataFrame({
+        'timestamp': timestamp,
+        'dt': pd.to_datetime(timestamp + local_offsets(timestamp), unit='s'),
+        'play_ms': play_ms,
+        'total_ms': total_ms,
+        'valid_play': valid_play,
+        'original_path': path
+    })
+
+def parse_log_range(log_path, start, end):
+    """Process pool worker: parses bytes [start, end) of the log (without tags)."""
+    with open(log_path, 'rb') as f:
+        f.seek(start)
+        return parse_log_bytes(f.read(end - start))
+
+def split_log_ranges(log_path, start, end, parts):
+    """Splits [start, end) into up to `parts` byte ranges that begin and end on line boundaries."""
+    bounds = [start]
+    with open(log_path, 'rb') as f:
+        for i in range(1, parts):
+            target = start + (end - start) * i // parts
+            if target <= bounds[-1]: continue
+            f.seek(target - 1)
+            f.readline()  # move to the start of the next line
+            cut = min(f.tell(), end)
+            if cut > bounds[-1]: bounds.append(cut)
+    if bounds[-1] < end: bounds.append(end)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def time_window(filter_val, now=None):
+    """Returns the (start, end) local datetimes of a Statistics filter; None = open."""
+    now = pd.Timestamp.now() if now is None else now
+    if filter_val == "This Year":
+        start = pd.Timestamp(year=now.year, month=1, day=1)
+        return start, start + pd.DateOffset(years=1)
+    if filter_val == "This Month":
+        start = pd.Timestamp(year=now.year, month=now.month, day=1)
+        return start, start + pd.DateOffset(months=1)
+    if filter_val == "This Week":
+        # Whole days, so rollups by day answer it exactly
+        return (now - pd.Timedelta(days=7)).normalize(), None
+    return None, None
+
+def local_seconds(times):
+    """Local datetimes (Series, array or scalar) as int64 seconds, the unit of the time index."""
+    return np.asarray(times, dtype='datetime64[s]').astype(np.int64)
+
+def sort_plays(df):
+    """Orders plays by local play time (stable), keeping an already sorted frame as is."""
+    if df.empty or df['dt'].is_monotonic_increasing: return df
+    return df.sort_values('dt', kind='stable', ignore_index=True)
+
+def concat_plays(frames):
+    """Concatenates play frames, merging categories so string columns stay categorical."""
+    frames = [f for f in frames if not f.empty]
+    if not frames: return empty_play_frame()
+    if len(frames) == 1: return frames[0]
+
+    dtypes = {}
+    for col in STRING_COLUMNS:
+        categories = frames[0][col].cat.categories
+        for f in frames[1:]:
+            categories = categories.union(f[col].cat.categories, sort=False)
+        dtypes[col] = pd.CategoricalDtype(categories)
+    return pd.concat([f.astype(dtypes) for f in frames], ignore_index=True)
+
+class RockboxData:
+    def __init__(self):
+        self.drive_path = ""
+        self.log_path = ""
+        self.music_path = ""
+        self.playlist_path = ""
+        self.device = ""
+        # (device, log_path) of other devices and archived logs merged into the history
+        self.extra_sources = []
+        self.df = pd.DataFrame()
+        self.checkpoints = {}      # log_path -> checkpoint
+        self.snapshot_loaded = None
+        self.stream_keys = np.empty(0, dtype=np.uint64)
+        # Streaming mode keeps only PlayAggregates counters instead of the per-play frame
+        self.stream_mode = False
+        self.max_memory_mb = 256
+        self.aggregates = None
+        # Bumped whenever the play history changes; derived tables are cached per version
+        self.version = 0
+        self.rollup_cache = None
+        self.time_index_cache = None
+        self.track_table_cache = None
+        # Processes used to parse large logs; 1 parses in this process
+        self.parse_workers = 1
+        self.parse_lock = threading.Lock()
+        self.existing_playlist_songs = set()
+        self.library_artists = set()
+        self.library_artists_key = None
+        self.cache_file = "metadata_cache.db"
+        self.cache_dir = "cache"
+        self.cache_lock = threading.Lock()
+        self.pending_tags = {}
+        self.tag_cache = self.load_cache()
+        self.rockbox_db = None
+        self.resolved_tags = {}
+        self.art_memory = OrderedDict()
+        self.library = None
+        self.library_lock = threading.Lock()
+
+    def load_cache(self):
+        """Opens the SQLite metadata cache (one row per path), creating it if needed."""
+        conn = sqlite3.connect(self.cache_file, check_same_thread=False)
+        conn.execute("""CREATE TABLE IF NOT EXISTS tags (
+                            path TEXT PRIMARY KEY,
+                            artist TEXT, album TEXT, title TEXT,
+                            size INTEGER, mtime REAL)""")
+        conn.commit()
+
+        # One-time import of the old JSON cache. Its entries carry no size/mtime,
+        # so they get re-validated the first time the file is seen on the drive.
+        legacy = os.path.splitext(self.cache_file)[0] + ".json"
+        if os.path.exists(legacy) and not conn.execute("SELECT 1 FROM tags LIMIT 1").fetchone():
+            try:
+                with open(legacy, 'r', encoding='utf-8') as f:
+                    old = json.load(f)
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO tags VALUES (?, ?, ?, ?, NULL, NULL)",
+                                     ((path, *val[:3]) for path, val in old.items()))
+            except Exception as e:
+                print(f"Error importing JSON cache: {e}")
+        return conn
+
+    def save_cache(self):
+        """Writes pending cache entries to SQLite in a single transaction."""
+        with self.cache_lock:
+            if not self.pending_tags: return
+            rows = [(path, *val) for path, val in self.pending_tags.items()]
+            try:
+                with self.tag_cache:
+                    self.tag_cache.executemany("INSERT OR REPLACE INTO tags VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self.pending_tags = {}
+            except Exception as e:
+                print(f"Error saving cache: {e}")
+
+    def lookup_cache(self, rockbox_path):
+        """Returns the cached (artist, album, title, size, mtime) row or None."""
+        with self.cache_lock:
+            if rockbox_path in self.pending_tags:
+                return self.pending_tags[rockbox_path]
+            return self.tag_cache.execute(
+                "SELECT artist, album, title, size, mtime FROM tags WHERE path = ?", (rockbox_path,)
+            ).fetchone()
+
+    def lookup_cache_many(self, paths):
+        """Returns {path: (artist, album, title, size, mtime)} for the cached paths."""
+        found = {}
+        with self.cache_lock:
+            for i in range(0, len(paths), 500):
+                batch = paths[i:i + 500]
+                marks = ",".join("?" * len(batch))
+                for row in self.tag_cache.execute(
+                        f"SELECT path, artist, album, title, size, mtime FROM tags WHERE path IN ({marks})", batch):
+                    found[row[0]] = row[1:]
+            for path in paths:
+                if path in self.pending_tags:
+                    found[path] = self.pending_tags[path]
+        return found
+
+    def set_paths(self, drive_path):
+        self.drive_path = drive_path
+        self.log_path = os.path.join(drive_path, ".rockbox", "playback.log")
+        self.music_path = os.path.join(drive_path, "Music")
+        self.playlist_path = os.path.join(drive_path, "Playlists")
+        self.rockbox_db = None
+        self.resolved_tags = {}
+        self.art_memory = OrderedDict()
+        self.library = None
+        self.library_artists_key = None
+        self.device = device_name(drive_path)
+
+        if not os.path.exists(self.log_path):
+            alt = os.path.join(drive_path, "playback.log")
+            if os.path.exists(alt):
+                self.log_path = alt
+                self.load_sources()
+                return False 
+        self.load_sources()
+        return os.path.exists(self.log_path)
+
+    def sources_file(self):
+        key = hashlib.md5(os.path.abspath(self.log_path).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"sources_{key}.json")
+
+    def load_sources(self):
+        """Restores the devices/logs registered for the connected drive."""
+        self.extra_sources = []
+        path = self.sources_file()
+        if not os.path.exists(path): return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.extra_sources = [tuple(item) for item in json.load(f)]
+        except Exception as e:
+            print(f"Error loading sources: {e}")
+
+    def save_sources(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self.sources_file(), 'w', encoding='utf-8') as f:
+                json.dump(self.extra_sources, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"Error saving sources: {e}")
+
+    def add_device(self, drive_path, device=None):
+        """Merges another device's playback.log into the history. Returns False if it has none."""
+        log_path = os.path.join(drive_path, ".rockbox", "playback.log")
+        if not os.path.exists(log_path):
+            log_path = os.path.join(drive_path, "playback.log")
+        return self.add_log(log_path, device or device_name(drive_path))
+
+    def add_log(self, log_path, device=None):
+        """Merges an archived or copied log file into the history under a device name.
+
+        Registered logs are remembered for the connected drive; a log that is
+        missing later (device unplugged) keeps its parsed plays."""
+        if not os.path.exists(log_path): return False
+        device = device or os.path.splitext(os.path.basename(log_path))[0]
+        if any(os.path.abspath(p) == os.path.abspath(log_path) for _, p in self.log_sources()): return True
+        with self.parse_lock:
+            # The plays already loaded stay valid; only the new log needs parsing
+            current = self.snapshot_loaded == self.snapshot_dir()
+            self.extra_sources.append((device, log_path))
+            if current: self.snapshot_loaded = self.snapshot_dir()
+        self.save_sources()
+        return True
+
+    def log_sources(self):
+        """(device, log_path) of every log in the history, the connected drive's first."""
+        return [(self.device, self.log_path)] + list(self.extra_sources)
+
+    def log_fingerprint(self, log_path, length):
+        """Hashes the first `length` bytes of the log to detect rotation."""
+        with open(log_path, 'rb') as f:
+            return hashlib.md5(f.read(length)).hexdigest()
+
+    def has_plays(self):
+        """True if plays are loaded, either as a frame or as streamed aggregates."""
+        if self.stream_mode:
+            return self.aggregates is not None and not self.aggregates.empty()
+        return not self.df.empty
+
+    def rollups(self):
+        """Per-day/hour/track rollups of the play history, built once per version.
+
+        Statistics filters are answered from these by slicing and summing
+        instead of scanning the plays. In streaming mode the streamed
+        aggregates are the rollups."""
+        if self.stream_mode: return self.aggregates
+        with self.parse_lock:
+            # Built under the parse lock so a background parse cannot change the frame meanwhile
+            if self.rollup_cache is None or self.rollup_cache[0] != self.version:
+                rollups = PlayAggregates(exact=True)
+                rollups.add(self.df)
+                self.rollup_cache = (self.version, rollups)
+            return self.rollup_cache[1]
+
+    def track_table(self):
+        """Per-track stats of the whole history, built once per version.
+
+        Indexed by original_path: artist, album, title, total_ms, plays,
+        first_played and last_played over all plays; play_count,
+        last_valid_played, played_ms and score (0.95 decay per day before the
+        last valid play) over valid plays. Smart playlists, the metrics
+        export and Discovery are filters and sorts over this table."""
+        if self.track_table_cache is None or self.track_table_cache[0] != self.version:
+            self.track_table_cache = (self.version, self.rollups().track_table())
+        return self.track_table_cache[1]
+
+    def time_index(self):
+        """Local play times of self.df as ascending int64 seconds, built once per version."""
+        if self.time_index_cache is None or self.time_index_cache[0] != self.version:
+            times = local_seconds(self.df['dt']) if not self.df.empty else np.empty(0, dtype=np.int64)
+            self.time_index_cache = (self.version, times)
+        return self.time_index_cache[1]
+
+    def time_range(self, start=None, end=None):
+        """Row positions (lo, hi) of the plays in [start, end) (naive local datetimes, None = open)."""
+        index = self.time_index()
+        lo = 0 if start is None else int(np.searchsorted(index, local_seconds(start), 'left'))
+        hi = len(index) if end is None else int(np.searchsorted(index, local_seconds(end), 'left'))
+        return lo, max(lo, hi)
+
+    def plays_between(self, start=None, end=None):
+        """Plays in [start, end) as a slice of self.df (no copy). The frame is kept
+        sorted by play time, so any window is two binary searches."""
+        lo, hi = self.time_range(start, end)
+        return self.df.iloc[lo:hi]
+
+    def make_checkpoint(self, log_path, offset, size):
+        head_len = min(size, LOG_HEAD_BYTES)
+        return {
+            'log_path': log_path,
+            'offset': offset,
+            'head_len': head_len,
+            'head_hash': self.log_fingerprint(log_path, head_len),
+            'stream': self.stream_mode
+        }
+
+    def resume_offset(self, log_path, size):
+        """Returns the byte offset to resume parsing a log from (0 = from the start)."""
+        cp = self.checkpoints.get(log_path)
+        if not cp or not self.has_plays(): return 0
+        if cp.get('stream', False) != self.stream_mode: return 0
+        # Truncated or rotated logs are parsed again from the start
+        if size < cp['offset']: return 0
+        if self.log_fingerprint(log_path, cp['head_len']) != cp['head_hash']: return 0
+        return cp['offset']
+
+    def snapshot_dir(self):
+        """Local folder holding the parsed frame of the current set of logs."""
+        paths = "\n".join(sorted(os.path.abspath(p) for _, p in self.log_sources()))
+        key = hashlib.md5(paths.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"plays_{key}")
+
+    def save_snapshot(self):
+        """Saves the parsed frame as one .npy file per column.
+
+        Categorical columns are stored as integer codes plus their categories;
+        meta.json is written last and marks the snapshot as complete."""
+        folder = self.snapshot_dir()
+        meta_path = os.path.join(folder, "meta.json")
+        try:
+            os.makedirs(folder, exist_ok=True)
+            if os.path.exists(meta_path): os.remove(meta_path)
+            # A log without play lines leaves nothing to save
+            if self.df.empty: return
+
+            strings = {}
+            for col in self.df.columns:
+                values = self.df[col]
+                if col in STRING_COLUMNS:
+                    strings[col] = values.cat.categories.tolist()
+                    values = values.cat.codes.astype(np.int32)
+                np.save(os.path.join(folder, f"{col}.npy"), np.asarray(values))
+
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'format': SNAPSHOT_FORMAT,
+                    'checkpoints': self.checkpoints,
+                    'rows': len(self.df),
+                    'columns': list(self.df.columns),
+                    'strings': strings
+                }, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"Error saving snapshot: {e}")
+
+    def load_snapshot(self):
+        """Restores the frame saved for the current logs. Returns True on success.
+
+        The checkpoints stored with it are validated against the logs by
+        resume_offset, so a rotated log is still parsed again."""
+        folder = self.snapshot_dir()
+        meta_path = os.path.join(folder, "meta.json")
+        if not os.path.exists(meta_path): return False
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('format') != SNAPSHOT_FORMAT: return False
+
+            columns = {}
+            for col in meta['columns']:
+                values = np.load(os.path.join(folder, f"{col}.npy"))
+                if len(values) != meta['rows']: return False
+                if col in meta['strings']:
+                    values = pd.Categorical.from_codes(values, categories=meta['strings'][col])
+                columns[col] = values
+
+            self.df = sort_plays(pd.DataFrame(columns))
+            self.checkpoints = meta['checkpoints']
+            return True
+        except Exception as e:
+            print(f"Error loading snapshot: {e}")
+            return False
+
+    def parse_log(self):
+        """Reads the logs and extracts real metadata from files.
+
+        Every registered log is parsed from its own checkpoint; new plays are
+        tagged with their device and dropped if an identical play (same
+        timestamp, path and play_ms) is already in the history."""
+        if not self.log_path or not os.path.exists(self.log_path): return False
+
+        with self.parse_lock:
+            try:
+                sources = [(device, path) for device, path in self.log_sources() if os.path.exists(path)]
+                if self.snapshot_loaded != self.snapshot_dir():
+                    self.df = pd.DataFrame()
+                    self.checkpoints = {}
+                    if not self.stream_mode: self.load_snapshot()
+                    self.snapshot_loaded = self.snapshot_dir()
+                    self.version += 1
+                if self.stream_mode:
+                    return self.stream_logs(sources)
+
+                sizes = {path: os.path.getsize(path) for _, path in sources}
+                starts = {path: self.resume_offset(path, sizes[path]) for _, path in sources}
+                # Nothing to resume from: rebuild the history from all logs
+                rebuild = all(start == 0 for start in starts.values())
+                kept = self.missing_plays(sources) if rebuild else self.df
+                seen = kept['play_key'].to_numpy() if not kept.empty else np.empty(0, dtype=np.uint64)
+
+                new_frames = []
+                cache_updated = False
+                for device, path in sources:
+                    new_df, end, updated = self.read_log(path, starts[path], sizes[path])
+                    self.checkpoints[path] = self.make_checkpoint(path, end, sizes[path])
+                    cache_updated |= updated
+                    if new_df is None: continue
+                    new_df, seen = self.dedup_plays(new_df, device, seen)
+                    if not new_df.empty: new_frames.append(new_df)
+
+                # Plays from another device interleave with the history: keep it time ordered
+                if rebuild:
+                    self.df = sort_plays(concat_plays([kept] + new_frames))
+                elif new_frames:
+                    self.df = sort_plays(concat_plays([self.df] + new_frames))
+                if rebuild or new_frames:
+                    self.version += 1
+
+                if cache_updated:
+                    self.save_cache()
+                if rebuild or new_frames:
+                    self.save_snapshot()
+
+                return True
+            except Exception as e:
+                print(f"Error parsing log: {e}")
+                return False
+
+    def missing_plays(self, sources):
+        """Plays of the logs that are registered but not on disk (an unplugged
+        device), kept when the history is rebuilt from the present logs.
+
+        Plays can only be told apart by device, so a missing log whose device
+        also has a present log loses its checkpoint instead and is parsed
+        again from the start when it comes back."""
+        present = {device for device, _ in sources}
+        missing = [(device, path) for device, path in self.log_sources() if (device, path) not in sources]
+        for device, path in missing:
+            if device in present: self.checkpoints.pop(path, None)
+        devices = {device for device, _ in missing} - present
+        if self.df.empty or not devices: return empty_play_frame()
+        return self.df[self.df['device'].isin(devices)].reset_index(drop=True)
+
+    def read_log(self, log_path, start, size):
+        """Parses the complete lines of [start, size) of one log.
+        Returns: DataFrame or None (nothing new), end offset, cache_updated(bool)"""
+        parallel = self.parse_workers > 1 and size - start >= PARALLEL_MIN_BYTES
+        if parallel:
+            end = self.line_end(log_path, start, size)
+        else:
+            with open(log_path, 'rb') as f:
+                f.seek(start)
+                chunk = f.read(size - start)
+            # Hold back a trailing line that is not terminated yet
+            end = start + chunk.rfind(b'\n') + 1
+        if end == start: return None, end, False
+
+        if parallel:
+            df, cache_updated = self.parse_parallel(log_path, start, end)
+        else:
+            df, cache_updated = self.parse_bytes(chunk[:end - start])
+        return df, end, cache_updated
+
+    def dedup_plays(self, df, device, seen):
+        """Adds the device and play_key columns and drops plays whose key is
+        in `seen` or repeated in the chunk. Returns: DataFrame, updated seen keys"""
+        df['device'] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), categories=[device])
+        keys = play_keys(df)
+        df['play_key'] = keys
+        keep = ~pd.Series(keys).duplicated().to_numpy() & ~np.isin(keys, seen)
+        if not keep.all():
+            df = df[keep].reset_index(drop=True)
+        return df, np.concatenate([seen, keys[keep]])
+
+    def line_end(self, log_path, start, size):
+        """Offset just past the last complete line in [start, size)."""
+        with open(log_path, 'rb') as f:
+            pos = size
+            while pos > start:
+                block_start = max(start, pos - 65536)
+                f.seek(block_start)
+                nl = f.read(pos - block_start).rfind(b'\n')
+                if nl >= 0: return block_start + nl + 1
+                pos = block_start
+        return start
+
+    def parse_parallel(self, log_path, start, end):
+        """Parses [start, end) of a log in a process pool, one line-aligned
+        byte range per worker. Tags are attached afterwards in this process so
+        the cache and the Rockbox database are only used from here.
+        Returns: DataFrame, cache_updated(bool)"""
+        ranges = split_log_ranges(log_path, start, end, self.parse_workers)
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            frames = list(pool.map(parse_log_range, [log_path] * len(ranges),
+                                   [a for a, _ in ranges], [b for _, b in ranges]))
+
+        frames = [f for f in frames if not f.empty]
+        if not frames: return self.attach_tags(empty_play_frame())
+        df = pd.concat(frames, ignore_index=True)
+        if not df['timestamp'].is_monotonic_increasing:
+            df = df.sort_values('timestamp', kind='stable', ignore_index=True)
+        return self.attach_tags(df)
+
+    def chunk_bytes(self):
+        """Log bytes read per streaming chunk, derived from the memory cap.
+
+        A parsed chunk needs several times its size while it is processed."""
+        return max(1 << 20, self.max_memory_mb * (1 << 20) // STREAM_MEMORY_FACTOR)
+
+    def iter_log_chunks(self, log_path=None, start=0):
+        """Yields (plays DataFrame, end offset, cache_updated) for consecutive
+        newline-aligned chunks of a log (default: the connected drive's),
+        starting at byte `start`."""
+        chunk_bytes = self.chunk_bytes()
+        with open(log_path or self.log_path, 'rb') as f:
+            f.seek(start)
+            offset = start
+            carry = b''
+            while True:
+                block = f.read(chunk_bytes)
+                if not block: break
+                data = carry + block
+                end = data.rfind(b'\n') + 1
+                carry = data[end:]
+                if end == 0: continue
+                offset += end
+                df, cache_updated = self.parse_bytes(data[:end])
+                yield df, offset, cache_updated
+
+    def iter_plays(self):
+        """Yields deduplicated play chunks of every registered log, from the start."""
+        seen = np.empty(0, dtype=np.uint64)
+        for device, path in self.log_sources():
+            if not os.path.exists(path): continue
+            for df, _, _ in self.iter_log_chunks(path):
+                df, seen = self.dedup_plays(df, device, seen)
+                yield df
+
+    def stream_logs(self, sources):
+        """Streaming variant of parse_log: folds the logs into self.aggregates
+        chunk by chunk without keeping the per-play frame. Only the play keys
+        are kept, for deduplication."""
+        sizes = {path: os.path.getsize(path) for _, path in sources}
+        starts = {path: self.resume_offset(path, sizes[path]) for _, path in sources}
+        if all(start == 0 for start in starts.values()):
+            self.aggregates = PlayAggregates()
+            self.df = empty_play_frame()
+            self.stream_keys = np.empty(0, dtype=np.uint64)
+            # The aggregates drop the plays of unplugged logs: parse them again when they return
+            for _, path in self.log_sources():
+                if not os.path.exists(path): self.checkpoints.pop(path, None)
+
+        for device, path in sources:
+            offset = starts[path]
+            for df, offset, cache_updated in self.iter_log_chunks(path, offset):
+                df, self.stream_keys = self.dedup_plays(df, device, self.stream_keys)
+                self.aggregates.add(df)
+                self.version += 1
+                if cache_updated:
+                    self.save_cache()
+            self.checkpoints[path] = self.make_checkpoint(path, offset, sizes[path])
+        return True
+
+    def parse_bytes(self, data):
+        """Parses raw log bytes and attaches tags. Returns: DataFrame, cache_updated(bool)"""
+        return self.attach_tags(parse_log_bytes(data))
+
+    def attach_tags(self, df):
+        """Adds categorical artist/album/title columns to a parsed frame.
+        Returns: DataFrame, cache_updated(bool)"""
+
+        # Tags are resolved once per unique track instead of once per play
+        codes, uniques = pd.factorize(df['original_path'])
+        resolved, cache_updated = self.resolve_metadata(list(uniques))
+        df['original_path'] = pd.Categorical.from_codes(codes, categories=uniques)
+
+        # String columns are categoricals: one copy of each string, int codes per play
+        tags = np.array([resolved[path] for path in uniques], dtype=object).reshape(-1, 3)
+        for i, col in enumerate(TAG_COLUMNS):
+            tag_codes, tag_values = pd.factorize(tags[:, i])
+            df[col] = pd.Categorical.from_codes(tag_codes[codes], categories=tag_values)
+
+        return df, cache_updated
+
+    def resolve_metadata(self, paths):
+        """Resolves tags for many paths at once.
+
+        Paths found in the Rockbox database need no file access at all. For
+        the rest, cache rows are fetched in batches; stats and tag reads
+        (mostly USB I/O wait) run in a bounded thread pool, and new entries
+        are merged into the cache in one batch.
+        Returns: {path: (artist, album, title)}, is_new(bool)"""
+        resolved = {}
+        for path in paths:
+            tags = self.resolved_tags.get(path) or self.tagcache_tags(path)
+            if tags: resolved[path] = tags
+        paths = [path for path in paths if path not in resolved]
+
+        cached = self.lookup_cache_many(paths)
+
+        def resolve(path):
+            full_path = self.full_path(path)
+            stat = self.file_stat(full_path)
+            hit = cached.get(path)
+            if hit and (stat is None or tuple(hit[3:]) == stat):
+                return path, tuple(hit[:3]), None
+            tags = self.read_tags(path, full_path, stat is not None)
+            return path, tags, tags + (stat if stat else (None, None))
+
+        with ThreadPoolExecutor(max_workers=TAG_WORKERS) as pool:
+            results = list(pool.map(resolve, paths))
+
+        new_rows = {path: row for path, _, row in results if row}
+        if new_rows:
+            with self.cache_lock:
+                self.pending_tags.update(new_rows)
+        resolved.update((path, tags) for path, tags, _ in results)
+        # Paths checked once per drive session are not stat'ed again by later chunks
+        self.resolved_tags.update(resolved)
+        return resolved, bool(new_rows)
+
+    def full_path(self, rockbox_path):
+        """Maps a Rockbox path (/<HDD0>/Music/...) to a path on the mounted drive."""
+        rel_path = rockbox_path.replace("/<HDD0>/", "").replace("/", os.sep)
+        return os.path.join(self.drive_path, rel_path)
+
+    def library_index(self, refresh=False):
+        """Returns the Music folder index, loaded and refreshed when first used for a drive.
+
+        `refresh=True` brings an existing index up to date with the drive
+        (only changed folders are scanned again)."""
+        with self.library_lock:
+            if self.library is None:
+                key = hashlib.md5(os.path.abspath(self.music_path).encode('utf-8')).hexdigest()[:16]
+                self.library = LibraryIndex(self.music_path, os.path.join(self.cache_dir, f"library_{key}.json"))
+                self.library.refresh()
+            elif refresh:
+                self.library.refresh()
+            return self.library
+
+    def walk_music(self, top):
+        """os.walk over `top`, served from the library index when it lies inside Music."""
+        index = self.library_index(refresh=True)
+        if index.rel_path(top) is not None and index.dirs:
+            return index.walk(top)
+        return os.walk(top)
+
+    def update_library_file(self, full_path):
+        """Keeps the index in sync after a file on the drive was rewritten."""
+        if self.library is not None:
+            with self.library_lock:
+                self.library.update_file(full_path)
+
+    def save_library(self):
+        if self.library is not None:
+            with self.library_lock:
+                self.library.save()
+
+    def file_stat(self, full_path):
+        """Returns (size, mtime) or None if the file is missing.
+
+        The file itself is stat'ed, not looked up in the library index:
+        retagging rewrites a file in place without touching its folder's
+        mtime, so the index can still hold the old size and mtime."""
+        try:
+            st = os.stat(full_path)
+            return st.st_size, st.st_mtime
+        except OSError:
+            return None
+
+    def get_metadata(self, rockbox_path):
+        """Returns: artist, album, title, is_new(bool)
+
+        The Rockbox database is checked first. Cached entries are reused while
+        the file's size and mtime match; if the file is not on the drive the
+        cached tags are kept."""
+        tags = self.tagcache_tags(rockbox_path)
+        if tags: return tags + (False,)
+
+        full_path = self.full_path(rockbox_path)
+        stat = self.file_stat(full_path)
+
+        cached = self.lookup_cache(rockbox_path)
+        if cached and (stat is None or tuple(cached[3:]) == stat):
+            return cached[0], cached[1], cached[2], False
+
+        artist, album, title = self.read_tags(rockbox_path, full_path, stat is not None)
+        size, mtime = stat if stat else (None, None)
+        with self.cache_lock:
+            self.pending_tags[rockbox_path] = (artist, album, title, size, mtime)
+        return artist, album, title, True
+
+    def read_tags(self, rockbox_path, full_path, exists):
+        """Reads tags from the audio file, falling back to the folder layout."""
+        # Imported here so commands that only need the parsed history skip mutagen
+        from mutagen import File
+        from mutagen.mp4 import MP4
+        artist, album, title = "Unknown", "Unknown Album", "Unknown Title"
+        found_tags = False
+
+        if exists:
+            try:
+                audio = File(full_path, easy=True) 
+                if audio:
+                    if 'artist' in audio: artist = audio['artist'][0]
+                    if 'album' in audio: album = audio['album'][0]
+                    if 'title' in audio: title = audio['title'][0]
+                    found_tags = True
+                
+                if not found_tags and full_path.lower().endswith('.m4a'):
+                    m4a = MP4(full_path)
+                    if '\xa9ART' in m4a: artist = m4a['\xa9ART'][0]
+                    if '\xa9alb' in m4a: album = m4a['\xa9alb'][0]
+                    if '\xa9nam' in m4a: title = m4a['\xa9nam'][0]
+                    found_tags = True
+            except Exception:
+                pass 
+
+        if not found_tags or artist == "Unknown":
+            artist, album, title = self.guess_tags_from_path(rockbox_path, artist, album)
+
+        return artist, album, title
+
+    def guess_tags_from_path(self, rockbox_path, artist, album):
+        """Derives artist/album/title from the Music/Artist/Album/file layout."""
+        path_parts = rockbox_path.replace("\\", "/").split("/")
+        if len(path_parts) > 3:
+            if "music" in path_parts[2].lower(): 
+                artist = path_parts[3]
+                if len(path_parts) > 4:
+                    album = path_parts[4]
+            filename = path_parts[-1]
+            title = re.sub(r'^\d+[\.\s-]*', '', os.path.splitext(filename)[0])
+        else:
+            title = os.path.basename(rockbox_path)
+        return artist, album, title
+
+    def tagcache_tags(self, rockbox_path):
+        """Looks the path up in the device's Rockbox database. Returns tags or None."""
+        if self.rockbox_db is None:
+            self.rockbox_db = load_tagcache(os.path.join(self.drive_path, ".rockbox"))
+        entry = self.rockbox_db.get(strip_volume(rockbox_path))
+        if entry is None: return None
+
+        artist = entry[0] or "Unknown"
+        album = entry[1] or "Unknown Album"
+        title = entry[2] or "Unknown Title"
+        if artist == "Unknown":
+            artist, album, title = self.guess_tags_from_path(rockbox_path, artist, album)
+        return artist, album, title
+
+    def get_album_art(self, rockbox_path):
+        """Returns a small PIL thumbnail of the track's cover or None.
+
+        Thumbnails are kept in an in-memory LRU by path and on disk under
+        cache/art keyed by path, size and mtime, so the audio file is only
+        opened the first time its art is needed (misses are cached too)."""
+        if rockbox_path in self.art_memory:
+            self.art_memory.move_to_end(rockbox_path)
+            return self.art_memory[rockbox_path]
+        from PIL import Image
+
+        full_path = self.full_path(rockbox_path)
+        stat = self.file_stat(full_path)
+        img = None
+        if stat is not None:
+            key = hashlib.md5(f"{rockbox_path}|{stat[0]}|{stat[1]}".encode('utf-8')).hexdigest()
+            thumb_path = os.path.join(self.cache_dir, "art", f"{key}.png")
+            miss_path = os.path.join(self.cache_dir, "art", f"{key}.none")
+            if os.path.exists(thumb_path):
+                try:
+                    img = Image.open(thumb_path)
+                    img.load()
+                except Exception:
+                    img = None
+            elif not os.path.exists(miss_path):
+                img = self.read_album_art(full_path)
+                self.save_thumbnail(img, thumb_path, miss_path)
+
+        self.art_memory[rockbox_path] = img
+        if len(self.art_memory) > ART_MEMORY_ITEMS:
+            self.art_memory.popitem(last=False)
+        return img
+
+    def read_album_art(self, full_path):
+        """Decodes the embedded cover of an audio file into a thumbnail, or None."""
+        from mutagen import File
+        from PIL import Image
+        try:
+            file = File(full_path)
+            artwork_data = None
+            if file.tags:
+                if hasattr(file.tags, 'getall'): 
+                    for tag in file.tags.keys():
+                        if tag.startswith('APIC'): 
+                            artwork_data = file.tags[tag].data
+                            break
+                if 'covr' in file.tags:
+                    artwork_data = file.tags['covr'][0]
+            if not artwork_data and hasattr(file, 'pictures') and file.pictures:
+                artwork_data = file.pictures[0].data
+
+            if artwork_data:
+                img = Image.open(BytesIO(artwork_data))
+                img.draft('RGB', ART_THUMB_SIZE)  # lets JPEG decode at reduced scale
+                img = img.convert('RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB')
+                img.thumbnail(ART_THUMB_SIZE)
+                return img
+        except Exception:
+            pass
+        return None
+
+    def save_thumbnail(self, img, thumb_path, miss_path):
+        try:
+            os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+            if img is None:
+                open(miss_path, 'wb').close()
+            else:
+                img.save(thumb_path, format='PNG')
+        except Exception as e:
+            print(f"Error saving thumbnail: {e}")
+
+    def scan_existing_playlists(self):
+        self.existing_playlist_songs = set()
+        if not os.path.exists(self.playlist_path): return
+
+        for pl_file in glob.glob(os.path.join(self.playlist_path, "*.m3u8")):
+            try:
+                with open(pl_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if not line.startswith('#') and line.strip():
+                            self.existing_playlist_songs.add(line.strip())
+            except: pass
+
+    def scan_library_artists(self):
+        """Builds the set of normalized artist names present on the drive.
+
+        Names come from the top-level Music folders, the Rockbox database
+        and the tag cache entries of files in the library. The index is
+        refreshed on every call and the set is rebuilt only when that refresh
+        found changes."""
+        if not os.path.exists(self.music_path):
+            self.library_artists = set()
+            return
+        try:
+            index = self.library_index(refresh=True)
+            key = (self.music_path, id(index), index.version)
+            if key == self.library_artists_key: return
+
+            names = set(index.top_folders())
+            if self.rockbox_db is None:
+                self.rockbox_db = load_tagcache(os.path.join(self.drive_path, ".rockbox"))
+            names.update(tags[0] for tags in self.rockbox_db.values() if tags[0])
+            with self.cache_lock:
+                rows = self.tag_cache.execute("SELECT path, artist FROM tags").fetchall()
+            names.update(artist for path, artist in rows
+                         if artist and index.stat(self.full_path(path)) is not None)
+            names.discard("Unknown")
+
+            self.library_artists = {normalize_name(name) for name in names} - {""}
+            self.library_artists_key = key
+        except Exception as e:
+            print(f"Error scanning library artists: {e}")
+
+    def normalize_text(self, text):
+        return normalize_name(text)
\ No newline at end of file
@@ -0,0 +1,143 @@
+import os
+import json
+
+class LibraryIndex:
+    """Index of the Music folder: files with size/mtime, grouped by directory.
+
+    Built with os.scandir and saved to disk. On refresh only directories are
+    stat'ed; a directory is scanned again only when its mtime changed (entries
+    added, removed or renamed). Keys are paths relative to the root with '/'."""
+
+    def __init__(self, root, index_file):
+        self.root = root
+        self.index_file = index_file
+        # {rel_dir: {'mtime': float, 'dirs': [names], 'files': {name: [size, mtime]}}}
+        self.dirs = {}
+        self.loaded = False
+        self.version = 0  # bumped whenever a refresh finds changes
+
+    def load(self):
+        self.loaded = True
+        if not os.path.exists(self.index_file): return
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('root') == os.path.abspath(self.root):
+                self.dirs = data['dirs']
+        except Exception as e:
+            print(f"Error loading library index: {e}")
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.index_file) or ".", exist_ok=True)
+            tmp = self.index_file + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'root': os.path.abspath(self.root), 'dirs': self.dirs}, f,
+                          ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp, self.index_file)
+        except Exception as e:
+            print(f"Error saving library index: {e}")
+
+    def refresh(self, full=False):
+        """Brings the index up to date with the drive. Returns True if anything changed."""
+        if not self.loaded: self.load()
+        if full: self.dirs = {}
+
+        seen = set()
+        changed = False
+        pending = [""]
+        while pending:
+            rel = pending.pop()
+            path = self.abs_path(rel)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            seen.add(rel)
+
+            entry = self.dirs.get(rel)
+            if entry is None or entry['mtime'] != mtime:
+                entry = self.scan_dir(path, mtime)
+                if entry is None: continue
+                self.dirs[rel] = entry
+                changed = True
+            pending.extend(f"{rel}/{name}" if rel else name for name in reversed(entry['dirs']))
+
+        for rel in [rel for rel in self.dirs if rel not in seen]:
+            del self.dirs[rel]
+            changed = True
+
+        if changed:
+            self.version += 1
+            self.save()
+        return changed
+
+    def scan_dir(self, path, mtime):
+        """Lists one directory with a single scandir pass."""
+        entry = {'mtime': mtime, 'dirs': [], 'files': {}}
+        try:
+            with os.scandir(path) as it:
+                for item in it:
+                    if item.is_dir():
+                        entry['dirs'].append(item.name)
+                    elif item.is_file():
+                        st = item.stat()
+                        entry['files'][item.name] = [st.st_size, st.st_mtime]
+        except OSError as e:
+            print(f"Error scanning {path}: {e}")
+            return None
+        entry['dirs'].sort()
+        return entry
+
+    def abs_path(self, rel):
+        return os.path.join(self.root, rel.replace("/", os.sep)) if rel else self.root
+
+    def rel_path(self, path):
+        """Path relative to the root in index form, or None if it lies outside."""
+        rel = os.path.relpath(os.path.abspath(path), os.path.abspath(self.root))
+        if rel == os.curdir: return ""
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep) or os.path.isabs(rel): return None
+        return rel.replace(os.sep, "/")
+
+    def stat(self, full_path):
+        """Returns (size, mtime) of an indexed file, or None if it is not in the index.
+
+        Files edited in place keep the values of the last scan of their folder,
+        so use this for existence, not to validate caches."""
+        rel = self.rel_path(full_path)
+        if not rel: return None
+        folder, _, name = rel.rpartition("/")
+        entry = self.dirs.get(folder)
+        if entry is None or name not in entry['files']: return None
+        size, mtime = entry['files'][name]
+        return size, mtime
+
+    def update_file(self, full_path):
+        """Re-stats one file after it was rewritten (e.g. art embedded)."""
+        rel = self.rel_path(full_path)
+        if not rel: return
+        folder, _, name = rel.rpartition("/")
+        entry = self.dirs.get(folder)
+        if entry is None: return
+        try:
+            st = os.stat(full_path)
+            entry['files'][name] = [st.st_size, st.st_mtime]
+        except OSError:
+            entry['files'].pop(name, None)
+
+    def top_folders(self):
+        """Names of the folders directly under the root (artist folders)."""
+        entry = self.dirs.get("")
+        return list(entry['dirs']) if entry else []
+
+    def walk(self, top=None):
+        """os.walk-style (dirpath, dirnames, filenames) from the index."""
+        rel = "" if top is None else self.rel_path(top)
+        if rel is None: return
+        pending = [rel]
+        while pending:
+            rel = pending.pop()
+            entry = self.dirs.get(rel)
+            if entry is None: continue
+            yield self.abs_path(rel), list(entry['dirs']), list(entry['files'])
+            pending.extend(f"{rel}/{name}" if rel else name for name in reversed(entry['dirs']))
\ No newline at end of file
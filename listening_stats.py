@@ -0,0 +1,53 @@
+import pandas as pd
+from play_aggregates import PlayAggregates
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+def compute_stats(data, start=None, end=None):
+    """Statistics of plays in [start, end) (naive local datetimes, None = open).
+
+    Returns None if there are no plays in the window, otherwise a dict with
+    minutes, plays, avg, tops {column: (top 5 counts, sample path)},
+    hour_counts (24), weekday_counts (7, Monday first), heatmap (7x24 valid
+    plays per weekday and hour) and timeline (valid plays per day from
+    timeline_start).
+
+    Windows of whole days are answered from the data's rollups, so switching
+    filters does not touch the individual plays. Other windows aggregate
+    just their slice of the time-ordered plays."""
+    if data.stream_mode or (whole_day(start) and whole_day(end)):
+        return aggregate_stats(data.rollups(), start, end)
+
+    window = PlayAggregates(exact=True)
+    window.add(data.plays_between(start, end))
+    if window.empty(): return None
+    return aggregate_stats(window, start, end)
+
+def whole_day(time):
+    return time is None or pd.Timestamp(time) == pd.Timestamp(time).normalize()
+
+def aggregate_stats(agg, start, end):
+    """Computes the statistics of [start, end) from PlayAggregates rollups."""
+    summary = agg.summary(start, end)
+    if summary is None: return None
+
+    total_plays = summary['valid_plays']
+    days_range = max(1, (summary['last_ts'] - summary['first_ts']) // 86400)
+
+    tops = {}
+    track_counts = summary['track_counts']
+    if track_counts.sum() > 0:
+        for col_name in ('artist', 'album', 'title'):
+            tops[col_name] = agg.top_values(track_counts, col_name)
+
+    return {
+        'minutes': int(summary['play_ms'] / 1000 / 60),
+        'plays': total_plays,
+        'avg': int(total_plays / days_range),
+        'tops': tops,
+        'hour_counts': summary['hour_counts'],
+        'weekday_counts': summary['weekday_counts'],
+        'heatmap': summary['heatmap'],
+        'timeline_start': summary['timeline_start'],
+        'timeline': summary['timeline']
+    }
\ No newline at end of file
@@ -0,0 +1,291 @@
+import pandas as pd
+import numpy as np
+
+# Sentinel for "no valid play yet" in integer timestamp columns
+NO_TIME = np.iinfo(np.int64).min
+
+# How per-track columns are combined when two partial tables are merged
+TRACK_MERGE = {
+    'artist': 'first', 'album': 'first', 'title': 'first', 'total_ms': 'first',
+    'plays': 'sum', 'first_ts': 'min', 'last_ts': 'max',
+    'play_count': 'sum', 'last_valid_ts': 'max', 'played_ms': 'sum', 'score': 'sum'
+}
+
+def count_pairs(keys, codes, names, weights=None):
+    """Number of occurrences (or sum of `weights`) of each (key, track) pair as a
+    Series indexed by (key, original_path), sorted by key. `codes` index into `names`."""
+    n = len(names)
+    pairs, inverse = np.unique(keys.astype(np.int64) * n + codes, return_inverse=True)
+    counts = np.bincount(inverse, weights=weights, minlength=len(pairs))
+    outer, inner = np.divmod(pairs, n)
+    keys_level, key_codes = np.unique(outer, return_inverse=True)
+    used, track_codes = np.unique(inner, return_inverse=True)
+    index = pd.MultiIndex(levels=[keys_level, np.asarray(names, dtype=object)[used]],
+                          codes=[key_codes, track_codes], names=[None, 'original_path'])
+    return pd.Series(counts.astype(np.int64), index=index)
+
+class PlayAggregates:
+    """Running per-track and per-time-bucket counters over the play history.
+
+    Chunks of plays are folded in with add() and then dropped, so memory
+    depends on the number of tracks and days in the history, not on the
+    number of plays. All times are local (the same clock as the `dt` column).
+
+    With exact=True valid plays are also counted per (day, track), which
+    makes Top 5 rankings exact for any range of whole days at the cost of
+    memory that grows with the number of distinct tracks played per day."""
+
+    def __init__(self, decay=0.95, exact=False):
+        self.decay = decay
+        self.exact = exact
+        self.tracks = None    # per-track stats, indexed by original_path
+        self.monthly = None   # valid plays per (month, original_path)
+        self.daily = None     # per-day totals, indexed by day number
+        self.hourly = None    # valid plays per day (rows) and hour (columns)
+        self.ref_day = None   # day the decay scores are relative to
+        self.day_tracks = None  # valid plays per (day, original_path), exact mode only
+        self.day_arrays = None  # (days, track codes, counts, tracks) cached for summary()
+        self.hourly_arrays = None  # (days, weekday-hour codes, counts) cached for heatmap()
+        self.tag_codes_cache = {}
+
+    def empty(self):
+        return self.tracks is None
+
+    def add(self, df):
+        """Folds a chunk of plays (same columns as RockboxData.df) into the counters."""
+        if df.empty: return
+
+        local = df['dt'].to_numpy().astype('datetime64[s]').astype(np.int64)
+        day = local // 86400
+        valid = df['valid_play'].to_numpy(dtype=bool)
+
+        # Decay scores are kept relative to the latest valid day seen so far;
+        # when it moves forward the existing scores are rescaled.
+        if valid.any():
+            new_ref = int(day[valid].max())
+            if self.ref_day is not None and new_ref > self.ref_day:
+                self.tracks['score'] *= self.decay ** (new_ref - self.ref_day)
+            self.ref_day = new_ref if self.ref_day is None else max(self.ref_day, new_ref)
+        ref = self.ref_day if self.ref_day is not None else 0
+        score = np.where(valid, self.decay ** (ref - day).clip(min=0).astype(float), 0.0)
+
+        # Tracks are grouped by integer codes; the frame's paths are already categorical
+        paths = df['original_path']
+        if isinstance(paths.dtype, pd.CategoricalDtype):
+            codes, names = paths.cat.codes.to_numpy().astype(np.intp), paths.cat.categories
+        else:
+            codes, names = pd.factorize(paths)
+
+        tracks = self.count_tracks(df, codes, names, local, valid, score)
+        self.tracks = self.merge(self.tracks, tracks, lambda t: t.groupby(level=0, sort=False).agg(TRACK_MERGE))
+        self.tag_codes_cache = {}
+
+        valid_codes = codes[valid]
+        months = local[valid].astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+        monthly = count_pairs(months, valid_codes, names)
+        self.monthly = self.merge(self.monthly, monthly, lambda m: m.groupby(level=[0, 1]).sum())
+
+        if self.exact:
+            day_tracks = count_pairs(day[valid], valid_codes, names)
+            self.day_tracks = self.merge(self.day_tracks, day_tracks, lambda m: m.groupby(level=[0, 1]).sum())
+            self.day_arrays = None
+
+        daily = pd.DataFrame({
+            'plays': 1, 'valid_plays': valid, 'play_ms': df['play_ms'].to_numpy(),
+            'first_ts': local, 'last_ts': local
+        }).groupby(day).agg({'plays': 'sum', 'valid_plays': 'sum', 'play_ms': 'sum',
+                             'first_ts': 'min', 'last_ts': 'max'})
+        self.daily = self.merge(self.daily, daily, lambda d: d.groupby(level=0).agg(
+            {'plays': 'sum', 'valid_plays': 'sum', 'play_ms': 'sum', 'first_ts': 'min', 'last_ts': 'max'}))
+
+        valid_days = day[valid]
+        if len(valid_days):
+            hours = (local[valid] % 86400) // 3600
+            base = valid_days.min()
+            span = int(valid_days.max() - base) + 1
+            grid = np.bincount((valid_days - base) * 24 + hours, minlength=span * 24).reshape(span, 24)
+            hourly = pd.DataFrame(grid, index=np.arange(base, base + span))[grid.sum(axis=1) > 0]
+            self.hourly = self.merge(self.hourly, hourly, lambda h: h.groupby(level=0).sum())
+            self.hourly_arrays = None
+
+    def count_tracks(self, df, codes, names, local, valid, score):
+        """Per-track stats of one chunk in a single pass of bincounts over the
+        track codes. Tracks keep the order of their first play."""
+        n = len(names)
+        plays = np.bincount(codes, minlength=n)
+        first_pos = np.full(n, len(codes))
+        np.minimum.at(first_pos, codes, np.arange(len(codes)))
+        present = np.flatnonzero(plays)
+        present = present[np.argsort(first_pos[present], kind='stable')]
+        pos = first_pos[present]
+
+        first_ts = np.full(n, np.iinfo(np.int64).max)
+        np.minimum.at(first_ts, codes, local)
+        last_ts = np.full(n, NO_TIME)
+        np.maximum.at(last_ts, codes, local)
+        last_valid_ts = np.full(n, NO_TIME)
+        np.maximum.at(last_valid_ts, codes[valid], local[valid])
+        played_ms = np.bincount(codes, weights=np.where(valid, df['play_ms'].to_numpy(), 0), minlength=n)
+
+        return pd.DataFrame({
+            'artist': df['artist'].to_numpy()[pos], 'album': df['album'].to_numpy()[pos],
+            'title': df['title'].to_numpy()[pos], 'total_ms': df['total_ms'].to_numpy()[pos],
+            'plays': plays[present].astype(np.int64),
+            'first_ts': first_ts[present], 'last_ts': last_ts[present],
+            'play_count': np.bincount(codes, weights=valid, minlength=n)[present].astype(np.int64),
+            'last_valid_ts': last_valid_ts[present],
+            'played_ms': played_ms[present].astype(np.int64),
+            'score': np.bincount(codes, weights=score, minlength=n)[present]
+        }, index=pd.Index(np.asarray(names, dtype=object)[present], name='original_path'))
+
+    def merge(self, current, new, combine):
+        if current is None: return new
+        return combine(pd.concat([current, new]))
+
+    def track_table(self):
+        """Per-track stats with datetime columns. Scores are relative to the last valid day."""
+        tracks = self.tracks.copy()
+        for col in ('first_ts', 'last_ts', 'last_valid_ts'):
+            ts = tracks[col].where(tracks[col] != NO_TIME)
+            tracks[col.replace('_ts', '_played')] = pd.to_datetime(ts, unit='s')
+        return tracks.drop(columns=['first_ts', 'last_ts', 'last_valid_ts'])
+
+    def period_counts(self, months=None):
+        """Valid plays per (year, original_path), optionally limited to some calendar months."""
+        index = self.monthly.index
+        month_index = index.get_level_values(0).to_numpy()
+        track_codes = index.codes[1]
+        counts = self.monthly.to_numpy()
+        if months is not None:
+            keep = np.isin(month_index % 12 + 1, list(months))
+            month_index, track_codes, counts = month_index[keep], track_codes[keep], counts[keep]
+        years = month_index // 12 + 1970
+        return count_pairs(years, track_codes, index.levels[1], weights=counts)
+
+    def summary(self, start=None, end=None):
+        """Headline numbers and chart counts for plays in [start, end) (naive local datetimes).
+
+        Totals and charts are exact to the day. Without exact mode, Top 5
+        rankings come from the monthly buckets, so windows that do not cover
+        whole months are approximated by the months they touch."""
+        bounds = self.day_bounds(start, end)
+        if bounds is None: return None
+        first_day, last_day = bounds
+        daily = self.daily.loc[first_day:last_day]
+        if daily['plays'].sum() == 0: return None
+
+        heatmap = self.heatmap(first_day, last_day)
+        # Valid plays per calendar day, zeros included, for the timeline
+        timeline = np.bincount(daily.index.to_numpy() - first_day, weights=daily['valid_plays'],
+                               minlength=last_day - first_day + 1).astype(np.int64)
+
+        track_counts = self.window_track_counts(first_day, last_day)
+
+        return {
+            'play_ms': int(daily['play_ms'].sum()),
+            'valid_plays': int(daily['valid_plays'].sum()),
+            'first_ts': int(daily['first_ts'].min()),
+            'last_ts': int(daily['last_ts'].max()),
+            'track_counts': track_counts,
+            'hour_counts': heatmap.sum(axis=0),
+            'weekday_counts': heatmap.sum(axis=1),
+            'heatmap': heatmap,
+            'timeline_start': np.datetime64(first_day, 'D'),
+            'timeline': timeline
+        }
+
+    def heatmap(self, first_day, last_day):
+        """Valid plays per (weekday, hour) over days [first_day, last_day], a 7x24 array
+        with Monday in row 0.
+
+        Each (day, hour) cell of the hourly table gets the code weekday * 24 + hour
+        and one bincount sums the cells of the range."""
+        if self.hourly is None: return np.zeros((7, 24), dtype=np.int64)
+        if self.hourly_arrays is None:
+            days = self.hourly.index.to_numpy()
+            weekdays = (days + 3) % 7  # 1970-01-01 was a Thursday
+            codes = weekdays[:, None] * 24 + np.arange(24)
+            self.hourly_arrays = (days, codes, self.hourly.to_numpy())
+        days, codes, grid = self.hourly_arrays
+
+        lo, hi = np.searchsorted(days, [first_day, last_day + 1])
+        heat = np.bincount(codes[lo:hi].ravel(), weights=grid[lo:hi].ravel(), minlength=7 * 24)
+        return heat.reshape(7, 24).astype(np.int64)
+
+    def day_bounds(self, start=None, end=None):
+        """First and last day number with plays in [start, end), None if there are none."""
+        # Days are sorted: the window is a binary search, not a mask over every day
+        days = self.daily.index.to_numpy()
+        lo = -np.inf if start is None else pd.Timestamp(start).value // 10**9 / 86400
+        hi = np.inf if end is None else pd.Timestamp(end).value // 10**9 / 86400
+        first = np.searchsorted(days, lo - 1, 'right')
+        last = np.searchsorted(days, hi, 'left')
+        if first >= last: return None
+        return int(days[first]), int(days[last - 1])
+
+    def window_track_counts(self, first_day, last_day):
+        """Valid plays per track over days [first_day, last_day]. Exact in exact mode,
+        otherwise taken from the monthly buckets of the months the days touch."""
+        if self.exact:
+            return self.day_track_counts(first_day, last_day)
+        month_index = self.monthly.index.get_level_values(0).to_numpy()
+        first_month = np.datetime64(first_day, 'D').astype('datetime64[M]').astype(np.int64)
+        last_month = np.datetime64(last_day, 'D').astype('datetime64[M]').astype(np.int64)
+        monthly = self.monthly[(month_index >= first_month) & (month_index <= last_month)]
+        return monthly.groupby(level=1).sum()
+
+    def decay_scores(self, decay):
+        """Per-track sum of decay ** (days before the last valid day) over valid plays.
+
+        The configured decay is kept up to date by add(); any other decay is
+        computed from the (day, track) table and needs exact mode."""
+        if decay == self.decay: return self.tracks['score']
+        if not self.exact:
+            raise ValueError(f"decay {decay} needs exact rollups (only {self.decay} is tracked)")
+        if self.day_tracks is None: return pd.Series(0.0, index=self.tracks.index)
+        days, codes, counts, tracks = self.day_table()
+        weights = counts * decay ** (self.ref_day - days).clip(min=0).astype(float)
+        scores = np.bincount(codes, weights=weights, minlength=len(tracks))
+        return pd.Series(scores, index=tracks).reindex(self.tracks.index, fill_value=0.0)
+
+    def day_track_counts(self, first_day, last_day):
+        """Valid plays per track over days [first_day, last_day] (exact mode).
+
+        The (day, track) table is sorted by day, so the range is found with a
+        binary search and summed with a bincount over the track codes."""
+        if self.day_tracks is None: return pd.Series(dtype=np.int64)
+        days, codes, counts, tracks = self.day_table()
+
+        lo, hi = np.searchsorted(days, [first_day, last_day + 1])
+        totals = np.bincount(codes[lo:hi], weights=counts[lo:hi], minlength=len(tracks)).astype(np.int64)
+        played = totals > 0
+        return pd.Series(totals[played], index=tracks[played])
+
+    def day_table(self):
+        """(days, track codes, counts, tracks) arrays of the (day, track) table, cached until the next add()."""
+        if self.day_arrays is None:
+            index = self.day_tracks.index
+            self.day_arrays = (index.get_level_values(0).to_numpy(), index.codes[1],
+                               self.day_tracks.to_numpy(), index.levels[1])
+        return self.day_arrays
+
+    def tag_codes(self, col):
+        """(codes, values) factorization of a per-track tag column, cached until the next add()."""
+        if col not in self.tag_codes_cache:
+            self.tag_codes_cache[col] = pd.factorize(self.tracks[col])
+        return self.tag_codes_cache[col]
+
+    def top_values(self, track_counts, col, n=5):
+        """Top `n` values of a tag column by plays, from per-track counts.
+        Returns: counts Series (value -> plays), most played track of the top value"""
+        positions = self.tracks.index.get_indexer(track_counts.index)
+        counts = track_counts.to_numpy()
+        codes, values = self.tag_codes(col)
+        track_codes = codes[positions]
+
+        totals = np.bincount(track_codes, weights=counts, minlength=len(values)).astype(np.int64)
+        order = np.argsort(-totals, kind='stable')[:n]
+        order = order[totals[order] > 0]
+        if len(order) == 0: return pd.Series(dtype=np.int64), None
+        sample = track_counts.index[np.argmax(np.where(track_codes == order[0], counts, -1))]
+        return pd.Series(totals[order], index=values[order]), sample
\ No newline at end of file
@@ -0,0 +1,180 @@
+import os
+import numpy as np
+import pandas as pd
+from data_manager import local_seconds
+from playlist_rules import BUILTIN_RULES, builtin_rules, load_rules
+
+# Playlists that can be generated, with their default track limits
+PLAYLIST_LIMITS = {spec['id']: spec['limit'] for spec in BUILTIN_RULES}
+
+# Tracks encoded per write when streaming user_metrics.json
+METRICS_CHUNK_ROWS = 20000
+
+class PlaylistGenerator:
+    """Builds the (Dynamic) smart playlists and user_metrics.json from RockboxData.
+
+    Playlists are PlaylistRules: the built-in ones plus custom rules from
+    .rockbox/playlist_rules.json on the drive and any `rule_files`.
+    Has no UI dependencies, so it is shared by PlaylistTab and the CLI."""
+
+    def __init__(self, data_manager, rule_files=()):
+        self.data = data_manager
+        self.rule_files = list(rule_files)
+        self.written = []     # playlists written in the last generate()
+        self.unchanged = []   # playlists whose content was already on the drive
+        self.removed = []     # stale playlists deleted
+        self.rule_cache = None
+        self.rule_cache_key = None
+
+    def rules_file(self):
+        return os.path.join(self.data.drive_path, ".rockbox", "playlist_rules.json")
+
+    def rule_paths(self):
+        return ([self.rules_file()] if self.data.drive_path else []) + self.rule_files
+
+    def rules(self):
+        """{id: PlaylistRule} of the built-in and custom rules; custom rules can replace built-ins.
+
+        The rule files are read (and their errors reported) again only when
+        one of them was added, removed or modified."""
+        key = tuple((path, os.path.getmtime(path) if os.path.exists(path) else None)
+                    for path in self.rule_paths())
+        if key != self.rule_cache_key:
+            rules = builtin_rules()
+            for path in self.rule_paths():
+                rules += load_rules(path)
+            self.rule_cache = {rule.id: rule for rule in rules}
+            self.rule_cache_key = key
+        return self.rule_cache
+
+    def custom_rule_limits(self):
+        """{id: limit} of the rules that are not built in."""
+        return {rule_id: rule.limit for rule_id, rule in self.rules().items() if rule_id not in PLAYLIST_LIMITS}
+
+    def generate(self, limits):
+        """Writes the playlists named in `limits` ({rule id: track limit}).
+
+        The log must already be parsed. Returns the written file names;
+        unchanged and removed playlists are listed in self.unchanged and
+        self.removed."""
+        self.written = []
+        self.unchanged = []
+        self.removed = []
+        rules = self.rules()
+        for rule_id, limit in limits.items():
+            rule = rules.get(rule_id)
+            if rule is None:
+                print(f"Unknown playlist rule: {rule_id}")
+                continue
+            try:
+                playlists = rule.evaluate(self.data, limit)
+            except Exception as e:
+                print(f"Error evaluating playlist rule {rule_id}: {e}")
+                continue
+
+            filenames = set()
+            for name, tracks in playlists:
+                filenames.add(f"(Dynamic) {name}.m3u8")
+                self.generate_m3u8(tracks.reset_index(), f"(Dynamic) {name}.m3u8")
+            # Periods no longer produced (old years, last month's flashback)
+            if rule.name_pattern():
+                self.remove_stale(rule.name_pattern(), filenames)
+        return self.written
+
+    def export_metrics(self, fmt="json"):
+        """Rescans the existing playlists and writes user_metrics (json or csv). Returns its path."""
+        self.data.scan_existing_playlists()
+        return self.generate_metrics_db(fmt)
+
+    def render_m3u8(self, df_subset):
+        """M3U8 text of the tracks, built from whole columns (no per-row Series)."""
+        n = len(df_subset)
+        ms = df_subset['total_ms'].to_numpy() if 'total_ms' in df_subset else np.zeros(n, dtype=np.int64)
+        secs = np.where(ms > 0, ms // 1000, -1)
+        titles = df_subset['title'].to_numpy() if 'title' in df_subset else ['Unknown Title'] * n
+        artists = df_subset['artist'].to_numpy() if 'artist' in df_subset else ['Unknown Artist'] * n
+        paths = df_subset['original_path'].to_numpy()
+        entries = "".join(f"#EXTINF:{sec},{title} - {artist}\n{path}\n"
+                          for sec, title, artist, path in zip(secs, titles, artists, paths))
+        return "#EXTM3U\n" + entries
+
+    def generate_m3u8(self, df_subset, filename):
+        """Writes the M3U8 playlist file to the iPod drive.
+
+        A playlist whose content is already on the drive is not rewritten;
+        otherwise it is written to a temporary file and renamed over the old
+        one, so a pulled cable never leaves a half-written playlist."""
+        if df_subset.empty:
+            return
+                    
+        if not os.path.exists(self.data.playlist_path): os.makedirs(self.data.playlist_path)
+        path = os.path.join(self.data.playlist_path, filename)
+        content = self.render_m3u8(df_subset)
+        try:
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    if f.read() == content:
+                        self.unchanged.append(filename)
+                        return
+
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            self.written.append(filename)
+        except Exception as e:
+            print(f"Error writing playlist {filename}: {e}")
+
+    def remove_stale(self, pattern, keep):
+        """Deletes '(Dynamic) <name>.m3u8' playlists whose name matches the rule's
+        `pattern` and that were not generated in this run."""
+        if not os.path.isdir(self.data.playlist_path): return
+        for filename in os.listdir(self.data.playlist_path):
+            if filename in keep or not (filename.startswith("(Dynamic) ") and filename.endswith(".m3u8")): continue
+            if pattern.fullmatch(filename[len("(Dynamic) "):-len(".m3u8")]):
+                try:
+                    os.remove(os.path.join(self.data.playlist_path, filename))
+                    self.removed.append(filename)
+                except Exception as e:
+                    print(f"Error removing playlist {filename}: {e}")
+
+    def metrics_table(self):
+        """Per-track usage metrics as columns, computed for all tracks at once."""
+        tracks = self.data.track_table()
+        last_played, first_played = tracks['last_played'], tracks['first_played']
+        last_log_date = last_played.max()
+        days_since = (last_log_date - last_played).dt.days
+        days_known = (last_log_date - first_played).dt.days
+        play_count = tracks['plays'].astype(np.int64)
+
+        return pd.DataFrame({
+            "track_id": tracks.index,
+            "play_count": play_count.to_numpy(),
+            "last_played_ts": local_seconds(last_played),
+            "recent_score": (1 - days_since / 365).clip(lower=0).round(2).to_numpy(),
+            "novelty_score": np.where(days_known < 30, 0.9, 0.1),
+            "cooccur_score": (play_count / (days_known + 1)).round(3).to_numpy(),
+            "is_on_playlist": tracks.index.isin(list(self.data.existing_playlist_songs))
+        })
+
+    def generate_metrics_db(self, fmt="json"):
+        """Writes the track usage metrics to .rockbox/user_metrics.json (or .csv).
+
+        The JSON has no indentation and is encoded in chunks as it is written,
+        so neither the file nor a list of dicts is built in memory."""
+        metrics = self.metrics_table()
+        path = os.path.join(self.data.drive_path, ".rockbox", f"user_metrics.{fmt}")
+        try:
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                if fmt == "csv":
+                    metrics.to_csv(f, index=False, lineterminator="\n")
+                    return path
+                f.write("[")
+                for start in range(0, len(metrics), METRICS_CHUNK_ROWS):
+                    if start: f.write(",")
+                    chunk = metrics.iloc[start:start + METRICS_CHUNK_ROWS]
+                    f.write(chunk.to_json(orient="records", double_precision=3)[1:-1])
+                f.write("]")
+            return path
+        except Exception as e:
+            print(f"Error writing metrics {path}: {e}")
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""Declarative smart playlist rules.
+
+A rule is a JSON object; every part is optional except the name:
+
+    {
+      "id": "rock_comeback",
+      "name": "Rock Comeback",
+      "window": {"last_days": 365},
+      "score": {"decay": 0.9},
+      "filter": [["artist", "in", ["Muse", "Queen"]], ["days_since_last", ">", 60]],
+      "sort": [["window_plays", "desc"], ["score", "desc"]],
+      "limit": 30
+    }
+
+window: {"last_days": N}, {"from": "YYYY-MM-DD", "to": "YYYY-MM-DD"} (both
+        inclusive), {"month": "current", "years": "before"} (this calendar
+        month in earlier years) or {"per": "year"} (one playlist per year;
+        "{year}" in the name is replaced).
+score:  {"decay": d} adds the column score = sum of d ** (days before the
+        last play) over the track's plays (0.95 by default).
+filter: [field, op, value] conditions, all of which must hold. op is one of
+        == != > >= < <= in "not in" contains; dates are "YYYY-MM-DD".
+sort:   [field, "asc" | "desc"] pairs, or "random".
+
+Fields: artist, album, title, total_ms, plays (all plays), play_count (valid
+plays), played_ms, score, first_played, last_played, last_valid_played,
+days_since_last and days_since_first (days before the last valid play in
+the history), and with a window window_plays and played_total_ms
+(window_plays * total_ms).
+
+Rules are compiled once into column masks and sort keys and evaluated
+against the per-track table and rollups of RockboxData, so a rule costs a
+few vectorized operations over the tracks, not a pass over the plays."""
+import calendar
+import datetime
+import json
+import operator
+import os
+import re
+import numpy as np
+import pandas as pd
+
+OPERATORS = {
+    "==": operator.eq, "!=": operator.ne,
+    ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+    "in": lambda col, value: col.isin(value),
+    "not in": lambda col, value: ~col.isin(value),
+    "contains": lambda col, value: col.astype(str).str.contains(str(value), case=False, regex=False)
+}
+
+# The built-in playlists, keyed by the ids PlaylistTab and the CLI use
+BUILTIN_RULES = [
+    {"id": "on_repeat", "name": "On Repeat",
+     "score": {"decay": 0.95}, "sort": [["score", "desc"]], "limit": 25},
+    {"id": "forgotten", "name": "Forgotten Favorites",
+     "filter": [["play_count", ">=", 3], ["days_since_last", ">", 180]],
+     "sort": [["play_count", "desc"]], "limit": 25},
+    {"id": "second_chance", "name": "Second Chance",
+     "filter": [["play_count", ">=", 1], ["play_count", "<=", 2]],
+     "sort": "random", "limit": 25},
+    {"id": "time_travel", "name": "Time Travel {year}",
+     "window": {"per": "year"}, "sort": [["window_plays", "desc"]], "limit": 50},
+    {"id": "flashback", "name": "Flashback - {month_name}",
+     "window": {"month": "current", "years": "before"},
+     "sort": [["window_plays", "desc"], ["played_total_ms", "desc"]], "limit": 50}
+]
+
+class PlaylistRule:
+    """A validated rule. Raises ValueError for malformed rules."""
+
+    def __init__(self, spec):
+        if not isinstance(spec, dict) or not spec.get("name"):
+            raise ValueError(f"rule without a name: {spec!r}")
+        self.name = str(spec["name"])
+        self.id = str(spec.get("id", self.name))
+        self.limit = int(spec.get("limit", 25))
+        self.window = spec.get("window") or {}
+        if not isinstance(self.window, dict):
+            raise ValueError(f"window must be an object, not {self.window!r}")
+        self.decay = float((spec.get("score") or {}).get("decay", 0.95))
+
+        self.filters = []
+        for condition in spec.get("filter", []):
+            if not isinstance(condition, list) or len(condition) != 3 or condition[1] not in OPERATORS:
+                raise ValueError(f"bad filter {condition!r}")
+            self.filters.append(tuple(condition))
+
+        sort = spec.get("sort", [["score", "desc"]])
+        self.random = sort == "random"
+        self.sort_by, self.ascending = [], []
+        if not self.random:
+            if not isinstance(sort, list) or not all(isinstance(pair, list) and len(pair) == 2 for pair in sort):
+                raise ValueError(f'sort must be "random" or a list of [field, "asc" | "desc"] pairs, not {sort!r}')
+            for field, direction in sort:
+                if direction not in ("asc", "desc"):
+                    raise ValueError("sort direction must be asc or desc")
+                self.sort_by.append(field)
+                self.ascending.append(direction == "asc")
+
+        per = self.window.get("per")
+        if per not in (None, "year"):
+            raise ValueError(f"unsupported window per {per!r}")
+        self.per_period = per is not None
+
+    def name_pattern(self):
+        """Compiled regex matching every name a templated rule can produce, else None."""
+        if "{" not in self.name: return None
+        fields = {"year": r"\d{4}",
+                  "month_name": "(?:" + "|".join(re.escape(m) for m in calendar.month_name[1:]) + ")"}
+        parts = re.split(r"\{(year|month_name)\}", self.name)
+        return re.compile("".join(fields[part] if i % 2 else re.escape(part) for i, part in enumerate(parts)))
+
+    def evaluate(self, data, limit=None, now=None):
+        """Returns [(playlist name, tracks DataFrame)] for the data's play history.
+        `limit` overrides the rule's track limit."""
+        limit = limit or self.limit
+        now = now or datetime.datetime.now()
+        agg = data.rollups()
+        tracks = data.track_table()
+        tracks = tracks[tracks['play_count'] > 0]
+        if tracks.empty: return []
+        tracks = self.add_columns(tracks, agg)
+
+        if self.per_period:
+            # All periods are filtered and ranked together, then cut per period
+            table = self.order(self.select(self.with_window(tracks, agg.period_counts())))
+            table = table.groupby('period', sort=True).head(limit)
+            return [(self.format_name(now, year=year), rows.drop(columns='period'))
+                    for year, rows in table.groupby('period', sort=True)]
+
+        counts = self.window_counts(agg, now)
+        if counts is not None:
+            tracks = self.with_window(tracks, counts)
+        table = self.order(self.select(tracks)).head(limit)
+        return [(self.format_name(now), table)]
+
+    def add_columns(self, tracks, agg):
+        latest = tracks['last_valid_played'].max()
+        day = pd.Timedelta(days=1)
+        return tracks.assign(
+            days_since_last=(latest - tracks['last_valid_played']) / day,
+            days_since_first=(latest - tracks['first_played']) / day,
+            score=agg.decay_scores(self.decay).reindex(tracks.index, fill_value=0.0))
+
+    def window_counts(self, agg, now):
+        """Valid plays per track in the rule's window, None without a window."""
+        window = self.window
+        if "last_days" in window:
+            start = pd.Timestamp(now).normalize() - pd.Timedelta(days=int(window["last_days"]) - 1)
+            return self.range_counts(agg, start, None)
+        if "from" in window or "to" in window:
+            start = pd.Timestamp(window["from"]) if window.get("from") else None
+            end = pd.Timestamp(window["to"]) + pd.Timedelta(days=1) if window.get("to") else None
+            return self.range_counts(agg, start, end)
+        if "month" in window:
+            month = now.month if window["month"] == "current" else int(window["month"])
+            counts = agg.period_counts(months=[month])
+            if window.get("years") == "before":
+                counts = counts[counts.index.get_level_values(0) < now.year]
+            return counts.groupby(level=1).sum()
+        return None
+
+    def range_counts(self, agg, start, end):
+        bounds = agg.day_bounds(start, end)
+        if bounds is None: return pd.Series(dtype=np.int64)
+        return agg.window_track_counts(*bounds)
+
+    def with_window(self, tracks, counts):
+        """One row per count (indexed by track, or by (period, track)) of the known
+        tracks, with the window columns and, for periods, a period column."""
+        paths = counts.index.get_level_values(-1)
+        known = paths.isin(tracks.index)
+        values = counts.to_numpy()[known]
+        table = tracks.loc[paths[known]]
+        table = table.assign(window_plays=values, played_total_ms=values * table['total_ms'].to_numpy())
+        if counts.index.nlevels > 1:
+            table = table.assign(period=counts.index.get_level_values(0)[known])
+        return table
+
+    def select(self, table):
+        """Applies all filters as one combined boolean mask."""
+        if not self.filters: return table
+        mask = np.ones(len(table), dtype=bool)
+        for field, op, value in self.filters:
+            if field not in table:
+                raise ValueError(f"unknown field {field!r}")
+            column = table[field]
+            if pd.api.types.is_datetime64_any_dtype(column) and op not in ("in", "not in"):
+                value = pd.Timestamp(value)
+            mask &= np.asarray(OPERATORS[op](column, value), dtype=bool)
+        return table[mask]
+
+    def order(self, table):
+        if self.random: return table.sample(frac=1)
+        missing = [field for field in self.sort_by if field not in table]
+        if missing: raise ValueError(f"unknown sort field {missing[0]!r}")
+        if not self.sort_by: return table
+        return table.sort_values(self.sort_by, ascending=self.ascending, kind='stable')
+
+    def format_name(self, now, year=None):
+        return self.name.format(year=year, month_name=now.strftime("%B"))
+
+def load_rules(path):
+    """Reads custom rules from a JSON file: a list of rules or {"playlists": [...]}.
+    Malformed rules are reported and skipped. Returns [PlaylistRule]."""
+    if not path or not os.path.exists(path): return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            specs = json.load(f)
+    except Exception as e:
+        print(f"Error loading playlist rules {path}: {e}")
+        return []
+    if isinstance(specs, dict): specs = specs.get("playlists", [])
+
+    rules = []
+    for spec in specs:
+        try:
+            rules.append(PlaylistRule(spec))
+        except (ValueError, TypeError) as e:
+            label = (spec.get("id") or spec.get("name")) if isinstance(spec, dict) else None
+            print(f"Error in playlist rule {label or spec!r} ({path}): {e}")
+    return rules
+
+def builtin_rules():
+    return [PlaylistRule(spec) for spec in BUILTIN_RULES]
\ No newline at end of file
@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import hashlib
+from data_manager import concat_plays
+
+API_URL = "http://ws.audioscrobbler.com/2.0/"
+
+class Scrobbler:
+    """Last.fm credentials, session and scrobble submission for RockboxData plays.
+
+    Has no UI dependencies, so it is shared by DiscoveryTab and the CLI."""
+
+    def __init__(self, data_manager, config_file="config.json"):
+        self.data = data_manager
+        self.config_file = config_file
+        self.api_key = ""
+        self.shared_secret = ""
+        self.session_key = ""
+        self.last_scrobble_time = 0
+
+    def load_config(self):
+        """Loads credentials and last scrobble state from config file."""
+        if os.path.exists(self.config_file):
+            try:
+                with open(self.config_file, 'r') as f:
+                    config = json.load(f)
+                    self.api_key = config.get("api_key", "")
+                    self.shared_secret = config.get("shared_secret", "")
+                    self.session_key = config.get("session_key", "")
+                    self.last_scrobble_time = config.get("last_scrobble_time", 0)
+                    return True
+            except: pass
+        return False
+
+    def save_config(self):
+        """Saves session and credentials to local JSON."""
+        data = {}
+        if os.path.exists(self.config_file):
+            try:
+                with open(self.config_file, 'r') as f: data = json.load(f)
+            except: pass
+
+        data["api_key"] = self.api_key
+        data["shared_secret"] = self.shared_secret
+        data["session_key"] = self.session_key
+        data["last_scrobble_time"] = self.last_scrobble_time
+
+        try:
+            with open(self.config_file, 'w') as f: json.dump(data, f, indent=4)
+        except: pass
+
+    def sign_request(self, params):
+        """Generates MD5 signature required by Last.fm for write operations."""
+        keys = sorted(params.keys())
+        sig_str = "".join(f"{k}{params[k]}" for k in keys) + self.shared_secret
+        return hashlib.md5(sig_str.encode('utf-8')).hexdigest()
+
+    def request_token(self):
+        """Returns (token, auth_url) for the browser authorization step."""
+        import requests
+        sig = self.sign_request({'method': 'auth.getToken', 'api_key': self.api_key})
+        url = f"{API_URL}?method=auth.getToken&api_key={self.api_key}&api_sig={sig}&format=json"
+        token = requests.get(url).json()['token']
+        return token, f"http://www.last.fm/api/auth/?api_key={self.api_key}&token={token}"
+
+    def request_session(self, token):
+        """Exchanges an authorized token for a session key. Returns the user name or None."""
+        import requests
+        params = {'method': 'auth.getSession', 'api_key': self.api_key, 'token': token}
+        params['api_sig'] = self.sign_request(params)
+        params['format'] = 'json'
+
+        resp = requests.get(API_URL, params=params).json()
+        if 'session' not in resp: return None
+
+        self.session_key = resp['session']['key']
+        self.save_config()
+        return resp['session']['name']
+
+    def pending_plays(self):
+        """Valid plays newer than the last submitted one. The log must already be parsed."""
+        if self.data.stream_mode:
+            # No per-play frame in memory: collect pending plays chunk by chunk
+            chunks = [df[(df['valid_play'] == True) & (df['timestamp'] > self.last_scrobble_time)]
+                      for df in self.data.iter_plays()]
+            return concat_plays(chunks)
+
+        df = self.data.df
+        return df[
+            (df['valid_play'] == True) &
+            (df['timestamp'] > self.last_scrobble_time)
+        ].copy()
+
+    def scrobble(self, pending, progress=None):
+        """Submits plays in batches of 50, saving progress after each batch.
+
+        `progress(text)` is called with status messages. Returns the number sent."""
+        import requests
+        total = len(pending)
+        sent_count = 0
+        batch_size = 50
+        chunks = [pending[i:i + batch_size] for i in range(0, pending.shape[0], batch_size)]
+
+        if progress: progress(f"Sending {total} songs in {len(chunks)} batches...")
+
+        for chunk in chunks:
+            payload = {
+                'method': 'track.scrobble',
+                'api_key': self.api_key,
+                'sk': self.session_key
+            }
+
+            idx = 0
+            max_ts_in_chunk = 0
+
+            for _, row in chunk.iterrows():
+                # Rockbox logs the end time. Last.fm expects start time.
+                start_ts = int(row['timestamp'] - (row['play_ms'] / 1000))
+
+                payload[f'artist[{idx}]'] = row['artist']
+                payload[f'track[{idx}]'] = row['title']
+                payload[f'album[{idx}]'] = row['album']
+                payload[f'timestamp[{idx}]'] = start_ts
+
+                if row['timestamp'] > max_ts_in_chunk:
+                    max_ts_in_chunk = row['timestamp']
+                idx += 1
+
+            payload['api_sig'] = self.sign_request(payload)
+            payload['format'] = 'json'
+
+            try:
+                resp = requests.post(API_URL, data=payload)
+                if resp.status_code == 200:
+                    sent_count += idx
+                    self.last_scrobble_time = int(max_ts_in_chunk)
+                    self.save_config()
+                    if progress: progress(f"Sent: {sent_count}/{total}")
+                else:
+                    print(f"Last.fm Error: {resp.text}")
+            except Exception as e:
+                print(f"Network error: {e}")
+
+            time.sleep(0.5)
+
+        return sent_count
\ No newline at end of file
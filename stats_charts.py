@@ -0,0 +1,108 @@
+"""Persistent matplotlib charts for the Statistics tab.
+
+The figures and their artists are created once; update() only changes
+their data and redraws the existing canvas."""
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+class BarChart:
+    """A bar chart embedded in a Tk frame. `polar=True` draws a 24h style clock."""
+
+    def __init__(self, master, labels, bg, color, polar=False, tick_labels=None):
+        self.fig = Figure(figsize=(4, 2.5), dpi=100, facecolor=bg)
+        self.ax = self.fig.add_subplot(111, polar=polar)
+        self.ax.set_facecolor(bg)
+        n = len(labels)
+
+        if polar:
+            theta = np.linspace(0.0, 2 * np.pi, n, endpoint=False)
+            self.bars = self.ax.bar(theta, np.zeros(n), width=(2 * np.pi) / n, bottom=0.0,
+                                    color=color, alpha=0.8)
+            self.ax.set_theta_zero_location("N")
+            self.ax.set_theta_direction(-1)
+            ticks = tick_labels or labels
+            self.ax.set_xticks(np.linspace(0, 2 * np.pi, len(ticks), endpoint=False))
+            self.ax.set_xticklabels(ticks, color="white", fontsize=8)
+            self.ax.set_yticklabels([])
+            self.ax.grid(False)
+            self.ax.spines['polar'].set_visible(False)
+        else:
+            self.bars = self.ax.bar(labels, np.zeros(n), color=color, alpha=0.8)
+            self.ax.tick_params(axis='x', colors='white', labelsize=9)
+            self.ax.tick_params(axis='y', colors='gray', labelsize=8)
+            self.ax.spines['top'].set_visible(False)
+            self.ax.spines['right'].set_visible(False)
+            self.ax.spines['left'].set_visible(False)
+            self.ax.spines['bottom'].set_color('#444')
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+    def update(self, counts):
+        """Sets the bar heights (one value per label) and redraws."""
+        for bar, height in zip(self.bars, counts):
+            bar.set_height(height)
+        top = max(float(np.max(counts)), 1.0) if len(counts) else 1.0
+        self.ax.set_ylim(0, top * 1.05)
+        self.canvas.draw_idle()
+
+class HeatmapChart:
+    """Weekday x hour grid of play counts, drawn with one reusable image."""
+
+    def __init__(self, master, row_labels, bg, cmap="magma"):
+        self.fig = Figure(figsize=(8, 2.4), dpi=100, facecolor=bg)
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_facecolor(bg)
+        self.image = self.ax.imshow(np.zeros((len(row_labels), 24)), aspect="auto", cmap=cmap,
+                                    interpolation="nearest", vmin=0, vmax=1)
+        self.ax.set_yticks(range(len(row_labels)))
+        self.ax.set_yticklabels(row_labels)
+        self.ax.set_xticks(range(0, 24, 3))
+        self.ax.set_xticklabels([f"{h:02d}" for h in range(0, 24, 3)])
+        self.ax.tick_params(axis='both', colors='gray', labelsize=8, length=0)
+        for spine in self.ax.spines.values():
+            spine.set_visible(False)
+        self.fig.tight_layout()
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+    def update(self, grid):
+        """Replaces the cell values (rows x 24) and redraws."""
+        self.image.set_data(grid)
+        self.image.set_clim(0, max(int(np.max(grid)), 1))
+        self.canvas.draw_idle()
+
+
+class TimelineChart:
+    """Plays per day as a filled line; one Line2D reused for every range."""
+
+    def __init__(self, master, bg, color):
+        self.fig = Figure(figsize=(8, 2.2), dpi=100, facecolor=bg)
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_facecolor(bg)
+        self.color = color
+        self.line, = self.ax.plot([], [], color=color, linewidth=1)
+        self.fill = None
+        self.ax.tick_params(axis='x', colors='white', labelsize=8)
+        self.ax.tick_params(axis='y', colors='gray', labelsize=8)
+        self.ax.spines['top'].set_visible(False)
+        self.ax.spines['right'].set_visible(False)
+        self.ax.spines['left'].set_visible(False)
+        self.ax.spines['bottom'].set_color('#444')
+        self.fig.autofmt_xdate()
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+    def update(self, first_day, counts):
+        """Shows `counts` (plays per day) starting at `first_day` (numpy datetime64[D])."""
+        days = first_day + np.arange(len(counts))
+        self.line.set_data(days, counts)
+        if self.fill is not None: self.fill.remove()
+        self.fill = self.ax.fill_between(days, counts, color=self.color, alpha=0.3, linewidth=0)
+        if len(counts):
+            self.ax.set_xlim(days[0], days[-1] + 1)
+            self.ax.set_ylim(0, max(float(np.max(counts)), 1.0) * 1.05)
+        self.canvas.draw_idle()
\ No newline at end of file
@@ -0,0 +1,85 @@
+import os
+import struct
+import numpy as np
+
+# Tag numbers used by Rockbox's tagcache (see apps/tagcache.h)
+TAG_ARTIST = 0
+TAG_ALBUM = 1
+TAG_TITLE = 3
+TAG_FILENAME = 4
+
+FLAG_DELETED = 0x0001
+UNTAGGED = "<Untagged>"
+
+HEADER_SIZE = 12          # magic, datasize, entry_count
+MASTER_HEADER_SIZE = 24   # header + serial, commitid, dirty
+
+def byte_order(magic):
+    """Detects the endianness of a .tcd file from its 'TCH' magic."""
+    if magic[1:4] == b'HCT': return '<'
+    if magic[0:3] == b'TCH': return '>'
+    return None
+
+def read_tag_file(path, order):
+    """Reads a database_N.tcd string file in one sequential pass.
+
+    Returns {file offset: string}, which is what the index entries point to."""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    strings = {}
+    pos = HEADER_SIZE
+    entry = struct.Struct(order + 'ii')
+    while pos + entry.size <= len(data):
+        length, _ = entry.unpack_from(data, pos)
+        if length < 0: break
+        raw = data[pos + entry.size:pos + entry.size + length]
+        strings[pos] = raw.split(b'\0', 1)[0].decode('utf-8', errors='ignore')
+        pos += entry.size + length
+    return strings
+
+def strip_volume(path):
+    """Drops the multi-volume prefix so log and database paths compare equal."""
+    return path[len("/<HDD0>"):] if path.startswith("/<HDD0>/") else path
+
+def load_tagcache(rockbox_dir):
+    """Builds {path: (artist, album, title)} from the Rockbox tagcache database.
+
+    Missing tags are returned as None. Returns an empty dict if the device
+    has no (readable) database."""
+    idx_path = os.path.join(rockbox_dir, "database_idx.tcd")
+    if not os.path.exists(idx_path): return {}
+
+    try:
+        with open(idx_path, 'rb') as f:
+            data = f.read()
+        order = byte_order(data[:4])
+        if order is None or len(data) < MASTER_HEADER_SIZE: return {}
+
+        entry_count = struct.unpack_from(order + 'i', data, 8)[0]
+        if entry_count <= 0: return {}
+        # TAG_COUNT changed between Rockbox versions, so derive it from the file size
+        fields = (len(data) - MASTER_HEADER_SIZE) // (entry_count * 4)
+        entries = np.frombuffer(data, dtype=order + 'i4', count=entry_count * fields,
+                                offset=MASTER_HEADER_SIZE).reshape(entry_count, fields)
+        entries = entries[(entries[:, -1] & FLAG_DELETED) == 0]
+
+        tags = {}
+        for tag in (TAG_ARTIST, TAG_ALBUM, TAG_TITLE, TAG_FILENAME):
+            tags[tag] = read_tag_file(os.path.join(rockbox_dir, f"database_{tag}.tcd"), order)
+    except Exception as e:
+        print(f"Error reading tagcache: {e}")
+        return {}
+
+    def value(tag, seek):
+        text = tags[tag].get(int(seek))
+        return None if not text or text == UNTAGGED else text
+
+    index = {}
+    for row in entries:
+        filename = tags[TAG_FILENAME].get(int(row[TAG_FILENAME]))
+        if not filename: continue
+        index[strip_volume(filename)] = (value(TAG_ARTIST, row[TAG_ARTIST]),
+                                         value(TAG_ALBUM, row[TAG_ALBUM]),
+                                         value(TAG_TITLE, row[TAG_TITLE]))
+    return index
\ No newline at end of file
@@ -0,0 +1,59 @@
+import os
+import shutil
+from data_manager import RockboxData
+
+def write_log(path, start, count, track):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            f.write(f"{start + i * 600}:200000:200000:/<HDD0>/Music/Artist/Album/{track}.mp3\n")
+
+def device_counts(data):
+    return data.df['device'].value_counts().to_dict()
+
+def test_unplugged_log_keeps_plays_when_history_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    drive = tmp_path / "drive"
+    os.makedirs(drive / ".rockbox")
+    main_log = drive / ".rockbox" / "playback.log"
+    other_log = tmp_path / "other.log"
+    write_log(main_log, 1700000000, 20, "a")
+    write_log(other_log, 1710000000, 1, "b")
+
+    data = RockboxData()
+    data.set_paths(str(drive))
+    assert data.add_log(str(other_log))
+    assert data.parse_log()
+    assert device_counts(data) == {'drive': 20, 'other': 1}
+
+    # Unplug the other device and rotate the main log: the history is rebuilt
+    shutil.move(other_log, tmp_path / "unplugged.log")
+    write_log(main_log, 1720000000, 1, "c")
+    assert data.parse_log()
+    assert device_counts(data) == {'drive': 1, 'other': 1}
+
+    # Plugged back in: its plays are neither lost nor counted twice
+    shutil.move(tmp_path / "unplugged.log", other_log)
+    assert data.parse_log()
+    assert device_counts(data) == {'drive': 1, 'other': 1}
+
+def test_unplugged_log_is_parsed_again_after_streaming_rebuild(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    drive = tmp_path / "drive"
+    os.makedirs(drive / ".rockbox")
+    main_log = drive / ".rockbox" / "playback.log"
+    other_log = tmp_path / "other.log"
+    write_log(main_log, 1700000000, 20, "a")
+    write_log(other_log, 1710000000, 1, "b")
+
+    data = RockboxData()
+    data.stream_mode = True
+    data.set_paths(str(drive))
+    data.add_log(str(other_log))
+    data.parse_log()
+
+    shutil.move(other_log, tmp_path / "unplugged.log")
+    write_log(main_log, 1720000000, 1, "c")
+    data.parse_log()
+    shutil.move(tmp_path / "unplugged.log", other_log)
+    data.parse_log()
+    assert data.aggregates.tracks['plays'].sum() == 2
\ No newline at end of file
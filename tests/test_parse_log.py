@@ -0,0 +1,69 @@
+import datetime
+import time
+import pytest
+from data_manager import parse_log_bytes
+
+def reference_parse(text):
+    """The per-line parser parse_log_bytes replaced, without the tag lookup."""
+    rows = []
+    for line in text.splitlines(True):
+        if line.startswith('#') or not line.strip(): continue
+        parts = line.strip().split(':')
+        if len(parts) < 4: continue
+        try:
+            timestamp, play_ms, total_ms = int(parts[0]), int(parts[1]), int(parts[2])
+        except ValueError:
+            continue
+        valid = total_ms > 0 and (play_ms / total_ms >= 0.45 or play_ms >= 120000)
+        rows.append((timestamp, datetime.datetime.fromtimestamp(timestamp), play_ms, total_ms,
+                     valid, ":".join(parts[3:])))
+    return rows
+
+def parsed_rows(data):
+    df = parse_log_bytes(data)
+    return list(zip(df['timestamp'].tolist(), df['dt'].dt.to_pydatetime().tolist(), df['play_ms'].tolist(),
+                    df['total_ms'].tolist(), df['valid_play'].tolist(), df['original_path'].tolist()))
+
+@pytest.fixture
+def berlin_time(monkeypatch):
+    monkeypatch.setenv("TZ", "Europe/Berlin")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+CASES = {
+    "plain": "1700000000:200000:200000:/<HDD0>/Music/A/B/01 x.mp3\n"
+             "1700000600:1000:200000:/<HDD0>/Music/A/B/02 y.mp3\n",
+    "comments_and_blank_lines": "# Rockbox playback log\n\n1700000000:90000:200000:/<HDD0>/Music/a.mp3\n\n"
+                                "#1700000600:200000:200000:/<HDD0>/Music/b.mp3\n",
+    "crlf": "# header\r\n\r\n1700000000:200000:200000:/<HDD0>/Music/a.mp3\r\n"
+            "1700000600:130000:400000:/<HDD0>/Music/b.mp3\r\n",
+    "colons_in_path": "1700000000:200000:200000:/<HDD0>/Music/A: B/C:D:E.mp3\n"
+                      "1700000600:200000:200000:/<HDD0>/Music/plain.mp3\n",
+    "garbage_numbers": "abc:200000:200000:/<HDD0>/Music/a.mp3\n1700000000:1.5:200000:/<HDD0>/Music/b.mp3\n"
+                       "1700000600:200000:200000:/<HDD0>/Music/c.mp3\n1700001200::200000:/<HDD0>/Music/d.mp3\n",
+    "too_few_fields": "1700000000:200000:/<HDD0>/Music/a.mp3\n1700000600:200000:200000:/<HDD0>/Music/b.mp3\n",
+    "zero_length_track": "1700000000:0:0:/<HDD0>/Music/a.mp3\n1700000600:5000:0:/<HDD0>/Music/b.mp3\n",
+    "no_final_newline": "1700000000:200000:200000:/<HDD0>/Music/a.mp3\n1700000600:200000:200000:/<HDD0>/Music/b.mp3",
+    # Around the 2023-10-29 and 2024-03-31 DST changes in Europe/Berlin
+    "dst": "".join(f"{ts}:200000:200000:/<HDD0>/Music/{i}.mp3\n"
+                   for i, ts in enumerate(range(1698533000, 1698546000, 1800)))
+           + "".join(f"{ts}:200000:200000:/<HDD0>/Music/s{i}.mp3\n"
+                     for i, ts in enumerate(range(1711843000, 1711856000, 1800))),
+}
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_matches_reference_parser(name, berlin_time):
+    text = CASES[name]
+    assert parsed_rows(text.encode('utf-8')) == reference_parse(text)
+
+def test_only_comments_gives_empty_frame():
+    df = parse_log_bytes(b"# nothing played yet\n\n")
+    assert df.empty
+    assert 'original_path' in df.columns
+
+def test_non_utf8_bytes_are_ignored():
+    data = b"1700000000:200000:200000:/<HDD0>/Music/caf\xe9.mp3\n"
+    df = parse_log_bytes(data)
+    assert df['original_path'].tolist() == ["/<HDD0>/Music/caf.mp3"]
\ No newline at end of file
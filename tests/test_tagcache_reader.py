@@ -0,0 +1,60 @@
+import struct
+import pytest
+from tagcache_reader import (FLAG_DELETED, TAG_ALBUM, TAG_ARTIST, TAG_FILENAME, TAG_TITLE,
+                             UNTAGGED, load_tagcache, strip_volume)
+
+MAGIC = 0x5443480f
+TAG_COUNT = 21
+
+def write_tag_file(path, order, strings):
+    """Writes database_N.tcd; returns {string: file offset}."""
+    body, offsets = b"", {}
+    for i, text in enumerate(strings):
+        data = text.encode('utf-8') + b"\0"
+        data += b"X" * (-len(data) % 4)
+        offsets[text] = 12 + len(body)
+        body += struct.pack(order + 'ii', len(data), i) + data
+    with open(path, 'wb') as f:
+        f.write(struct.pack(order + 'Iii', MAGIC, len(body), len(strings)) + body)
+    return offsets
+
+def write_database(folder, order, tracks):
+    """tracks: [(artist, album, title, filename, flag)] written as a Rockbox database."""
+    columns = {TAG_ARTIST: 0, TAG_ALBUM: 1, TAG_TITLE: 2, TAG_FILENAME: 3}
+    offsets = {tag: write_tag_file(folder / f"database_{tag}.tcd", order,
+                                   sorted({t[col] for t in tracks}))
+               for tag, col in columns.items()}
+    body = b""
+    for track in tracks:
+        seeks = [0] * TAG_COUNT
+        for tag, col in columns.items():
+            seeks[tag] = offsets[tag][track[col]]
+        body += struct.pack(order + f'{TAG_COUNT}i', *seeks) + struct.pack(order + 'i', track[4])
+    header = struct.pack(order + 'Iiiiii', MAGIC, len(body), len(tracks), 1, 1, 0)
+    (folder / "database_idx.tcd").write_bytes(header + body)
+
+TRACKS = [
+    ("Artist A", "Album A", "Song 1", "/<HDD0>/Music/Artist A/Album A/01.mp3", 0),
+    (UNTAGGED, UNTAGGED, "Song 2", "/<HDD0>/Music/Loose/02.mp3", 0),
+    ("Gone", "Gone", "Deleted", "/<HDD0>/Music/Gone/03.mp3", FLAG_DELETED),
+    ("Artist B", "Album B", "Song 4", "/Music/Artist B/Album B/04.flac", 0x0004),
+]
+
+@pytest.mark.parametrize("order", ['<', '>'])
+def test_reads_both_byte_orders(tmp_path, order):
+    write_database(tmp_path, order, TRACKS)
+    assert load_tagcache(str(tmp_path)) == {
+        "/Music/Artist A/Album A/01.mp3": ("Artist A", "Album A", "Song 1"),
+        "/Music/Loose/02.mp3": (None, None, "Song 2"),
+        "/Music/Artist B/Album B/04.flac": ("Artist B", "Album B", "Song 4"),
+    }
+
+def test_missing_or_unknown_database_is_empty(tmp_path):
+    assert load_tagcache(str(tmp_path)) == {}
+    (tmp_path / "database_idx.tcd").write_bytes(b"\0" * 64)
+    assert load_tagcache(str(tmp_path)) == {}
+
+def test_strip_volume():
+    assert strip_volume("/<HDD0>/Music/a.mp3") == "/Music/a.mp3"
+    assert strip_volume("/Music/a.mp3") == "/Music/a.mp3"
+    assert strip_volume("/<HDD0>") == "/<HDD0>"
\ No newline at end of file